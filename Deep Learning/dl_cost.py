@@ -0,0 +1,172 @@
+"""
+Copyright (c) 2025 Authors
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is furnished
+to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED,
+INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A
+PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+Author: James Guana
+"""
+
+# Analytic cost estimates for the layers the components build. FLOPs count a
+# multiply-add as two operations and cover matmuls/convolutions plus bias; activation
+# functions and other elementwise work are counted as one operation per output value.
+
+import math
+
+import numpy as np
+
+# optimizer variables per weight when the optimizer is not built yet (adam: two moments)
+DEFAULT_OPTIMIZER_SLOTS = 2
+
+_RECURRENT_GATES = {"SimpleRNN": 1, "GRU": 3, "LSTM": 4}
+
+
+def _size (shape) -> int:
+    return math.prod(shape) if all(dim is not None for dim in shape) else None
+
+
+def _dtype_bytes (dtype: str) -> int:
+    return {"float16": 2, "bfloat16": 2, "float64": 8}.get(str(dtype), 4)
+
+
+def _channels_and_positions (layer, shape):
+    """Channel count and number of spatial positions of a conv-style activation shape."""
+
+    if getattr(layer, "data_format", "channels_last") == "channels_first":
+        return shape[1], _size(shape[2:])
+    return shape[-1], _size(shape[1:-1])
+
+
+def layer_flops (layer, input_shape, output_shape) -> int:
+    """FLOPs per sample of one layer, from its config and (batch-less) shapes, or None if
+    a dimension is unknown."""
+
+    name = layer.__class__.__name__
+    outputs = _size(output_shape)
+    if outputs is None:
+        return None
+
+    if name == "Dense":
+        leading = _size(input_shape[:-1])
+        return leading * layer.units * (2 * input_shape[-1] + int(layer.use_bias)) + outputs
+
+    if name in ("Conv1D", "Conv2D", "Conv3D"):
+        channels_in, _ = _channels_and_positions(layer, (None, *input_shape))
+        channels_out, positions = _channels_and_positions(layer, (None, *output_shape))
+        per_output = 2 * math.prod(layer.kernel_size) * channels_in // layer.groups + int(layer.use_bias)
+        return positions * channels_out * per_output + outputs
+
+    if name in ("SeparableConv1D", "SeparableConv2D", "DepthwiseConv1D", "DepthwiseConv2D"):
+        channels_in, _ = _channels_and_positions(layer, (None, *input_shape))
+        channels_out, positions = _channels_and_positions(layer, (None, *output_shape))
+        depthwise = positions * channels_in * layer.depth_multiplier * 2 * math.prod(layer.kernel_size)
+        pointwise = positions * 2 * channels_in * layer.depth_multiplier * channels_out if name.startswith("Separable") else 0
+        return depthwise + pointwise + positions * channels_out * int(layer.use_bias) + outputs
+
+    if name in _RECURRENT_GATES:
+        steps, features, units = input_shape[0], input_shape[-1], layer.units
+        if steps is None:
+            return None
+        gates = _RECURRENT_GATES[name]
+        # input and recurrent matmuls per gate, plus bias and gate arithmetic
+        return steps * gates * units * (2 * (features + units) + 2)
+
+    if "Pooling" in name and not name.startswith("Global"):
+        return outputs * math.prod(layer.pool_size)
+
+    if name.startswith("Global"):
+        return _size(input_shape)
+
+    if name in ("InputLayer", "Flatten", "Reshape", "Dropout"):
+        return 0
+
+    return outputs
+
+
+def cost_table (model, batch_size: int = 32) -> list:
+    """Per-layer parameters, FLOPs per sample and activation bytes per batch of a built
+    model, followed by a total row with the estimated training memory footprint.
+
+    Training memory is weights, gradients and optimizer variables plus every layer
+    output kept for the backward pass and one activation-gradient buffer of the largest
+    layer output.
+    """
+
+    if not model.built or not getattr(model, "inputs", None):
+        raise ValueError("Cost analysis needs a model with a Keras Input layer.")
+
+    rows = []
+    for layer in model.layers:
+        input_shape = tuple(layer.input.shape[1:])
+        output_shape = tuple(layer.output.shape[1:])
+        outputs = _size(output_shape)
+        activation_bytes = outputs * batch_size * _dtype_bytes(layer.compute_dtype) if outputs is not None else None
+
+        rows.append(dict(
+            layer=layer.name,
+            type=layer.__class__.__name__,
+            output_shape=str((None, *output_shape)),
+            params=layer.count_params(),
+            flops_per_sample=layer_flops(layer, input_shape, output_shape),
+            activation_bytes=activation_bytes,
+        ))
+
+    weight_bytes = sum(int(np.prod(w.shape)) * _dtype_bytes(w.dtype) for w in model.weights)
+    trainable_bytes = sum(int(np.prod(w.shape)) * _dtype_bytes(w.dtype) for w in model.trainable_weights)
+
+    optimizer = getattr(model, "optimizer", None)
+    if optimizer is not None and optimizer.built:
+        optimizer_bytes = sum(int(np.prod(v.shape)) * _dtype_bytes(v.dtype) for v in optimizer.variables)
+    else:
+        optimizer_bytes = DEFAULT_OPTIMIZER_SLOTS * trainable_bytes
+
+    activations = [row["activation_bytes"] for row in rows if row["activation_bytes"] is not None]
+    flops = [row["flops_per_sample"] for row in rows]
+    unknown = any(value is None for value in flops) or len(activations) < len(rows)
+
+    rows.append(dict(
+        layer="total",
+        type="",
+        output_shape="",
+        params=model.count_params(),
+        flops_per_sample=sum(value for value in flops if value is not None),
+        activation_bytes=sum(activations),
+        weight_bytes=weight_bytes,
+        training_memory_bytes=weight_bytes + trainable_bytes + optimizer_bytes + sum(activations) + max(activations, default=0),
+        incomplete=unknown,
+    ))
+
+    return rows
+
+
+def spec_costs (keras, layers, input_shape=None) -> list:
+    """(class name, output shape, FLOPs per sample) of each layer spec, from the shape of
+    the spec's Input layer (or `input_shape`) without building a model or any weights."""
+
+    shape = tuple(input_shape) if input_shape is not None else None
+    rows = []
+    for spec in layers:
+        if spec.class_name == "Input":
+            shape = tuple(dict(spec.config)["shape"])
+            continue
+        if shape is None:
+            raise ValueError("Cost estimates need a Keras Input layer in front of the other layers.")
+        layer = spec.build(keras)
+        output_shape = tuple(layer.compute_output_shape((None, *shape))[1:])
+        rows.append((spec.class_name, output_shape, layer_flops(layer, shape, output_shape)))
+        shape = output_shape
+    return rows
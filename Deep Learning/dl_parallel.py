@@ -0,0 +1,390 @@
+"""
+Copyright (c) 2025 Authors
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is furnished
+to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED,
+INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A
+PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+Author: James Guana
+"""
+
+# Model-averaging training and hyperparameter sweeps over local worker processes. Workers are started with the
+# spawn method (forking a process that already initialized a backend is unsafe) and
+# import keras themselves, so this module must not import keras at module level.
+
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import replace
+from multiprocessing.connection import Connection
+from types import SimpleNamespace
+import itertools
+import math
+import multiprocessing
+import os
+import random
+import shutil
+import tempfile
+import time
+
+import numpy as np
+
+from dl_utils import LayerSpec, available_memory, restore_state, snapshot_state
+
+
+def _limit_threads (threads: int):
+    # split the cores between workers instead of every worker using all of them
+    for variable in ("OMP_NUM_THREADS", "TF_NUM_INTRAOP_THREADS", "MKL_NUM_THREADS"):
+        os.environ[variable] = str(threads)
+    os.environ["TF_NUM_INTEROP_THREADS"] = "1"
+
+
+def _worker (conn: Connection, backend: str, model_json: str, compile_config, x_path: str, y_path: str, rows, threads: int):
+    _limit_threads(threads)
+    os.environ["KERAS_BACKEND"] = backend
+
+    import keras
+
+    if backend == "torch":
+        import torch
+        torch.set_num_threads(threads)
+
+    model = keras.models.model_from_json(model_json)
+    model.compile_from_config(compile_config)
+
+    start, stop = rows
+    x = np.load(x_path, mmap_mode="r")[start:stop]
+    y = np.load(y_path, mmap_mode="r")[start:stop] if y_path else None
+
+    while True:
+        command, *args = conn.recv()
+
+        if command == "stop":
+            break
+
+        if command == "warmup":
+            # traces the train step for this batch size outside of the timed epochs
+            batch_size, = args
+            model.fit(x[:batch_size], None if y is None else y[:batch_size], batch_size=batch_size, epochs=1, verbose=0)
+            conn.send(True)
+
+        elif command == "epoch":
+            weights, batch_size = args
+            model.set_weights(weights)
+            begin = time.perf_counter()
+            history = model.fit(x, y, batch_size=batch_size, epochs=1, verbose=0, shuffle=True)
+            seconds = time.perf_counter() - begin
+            logs = {name: float(values[-1]) for name, values in history.history.items()}
+            conn.send((model.get_weights(), logs, len(x), seconds))
+
+    conn.close()
+
+
+def fit_model_averaging (model, x: np.ndarray, y: np.ndarray, batch_size: int, epochs: int, workers: int, calibration_steps: int = 50):
+    """Trains `model` by model averaging over `workers` local processes, each holding a replica and a shard of the data.
+
+    Every epoch the replicas start from the current weights, train one epoch on their
+    shard with a per-worker batch of batch_size / workers, and their weights are averaged
+    (weighted by shard size) back into `model`. Gradients are not exchanged between steps,
+    so this is not data-parallel training and converges differently from training in a
+    single process. Returns a History-like object and a report with the achieved throughput
+    and the speedup against training in a single process.
+    """
+
+    import keras
+
+    backend = keras.backend.backend()
+    workers = max(1, min(workers, len(x)))
+    worker_batch = max(1, batch_size // workers)
+    threads = max(1, (os.cpu_count() or 1) // workers)
+
+    directory = tempfile.mkdtemp(prefix="keras_parallel_")
+    context = multiprocessing.get_context("spawn")
+    processes, connections = [], []
+
+    try:
+        # workers memory-map their shard instead of receiving a pickled copy
+        x_path = os.path.join(directory, "x.npy")
+        np.save(x_path, x)
+        y_path = ""
+        if y is not None:
+            y_path = os.path.join(directory, "y.npy")
+            np.save(y_path, y)
+
+        # single-process throughput at the full batch size is the baseline for the scaling
+        # efficiency; it is measured before the workers start so they do not compete for the
+        # cores, and the model is rewound afterwards
+        state = snapshot_state(model)
+        samples = min(len(x), calibration_steps * batch_size)
+        model.fit(x[:batch_size], None if y is None else y[:batch_size], batch_size=batch_size, epochs=1, verbose=0)
+        begin = time.perf_counter()
+        model.fit(x[:samples], None if y is None else y[:samples], batch_size=batch_size, epochs=1, verbose=0)
+        calibration_seconds = time.perf_counter() - begin
+        restore_state(model, state)
+        single_throughput = samples / calibration_seconds if calibration_seconds else None
+
+        bounds = np.linspace(0, len(x), workers + 1).astype(np.int64)
+        model_json = model.to_json()
+        compile_config = model.get_compile_config()
+
+        for worker in range(workers):
+            parent, child = context.Pipe()
+            process = context.Process(
+                target=_worker,
+                args=(child, backend, model_json, compile_config, x_path, y_path, (bounds[worker], bounds[worker + 1]), threads),
+                daemon=True,
+            )
+            process.start()
+            processes.append(process)
+            connections.append(parent)
+
+        for connection in connections:
+            connection.send(("warmup", worker_batch))
+
+        for connection in connections:
+            connection.recv()
+
+        history = SimpleNamespace(history={}, epoch=[])
+        total_samples, total_seconds = 0, 0.0
+
+        for epoch in range(epochs):
+            weights = model.get_weights()
+            begin = time.perf_counter()
+
+            for connection in connections:
+                connection.send(("epoch", weights, worker_batch))
+            results = [connection.recv() for connection in connections]
+
+            total_seconds += time.perf_counter() - begin
+            samples = np.array([result[2] for result in results], dtype=np.float64)
+            total_samples += int(samples.sum())
+            shares = samples / samples.sum()
+
+            averaged = []
+            for i, reference in enumerate(weights):
+                total = sum(share * np.asarray(result[0][i], dtype=np.float64) for share, result in zip(shares, results))
+                averaged.append(total.astype(np.asarray(reference).dtype))
+            model.set_weights(averaged)
+
+            history.epoch.append(epoch)
+            for name in results[0][1]:
+                history.history.setdefault(name, []).append(float(sum(share * result[1][name] for share, result in zip(shares, results))))
+
+        throughput = total_samples / total_seconds if total_seconds else None
+        report = dict(
+            workers=workers,
+            worker_batch_size=worker_batch,
+            threads_per_worker=threads,
+            samples_per_second=throughput,
+            single_process_samples_per_second=single_throughput,
+            speedup=throughput / single_throughput if throughput and single_throughput else None,
+            scaling_efficiency=throughput / (workers * single_throughput) if throughput and single_throughput else None,
+        )
+
+        return history, report
+
+    finally:
+        for connection in connections:
+            try:
+                connection.send(("stop",))
+            except (BrokenPipeError, OSError):
+                pass
+        for process in processes:
+            process.join(timeout=10)
+            if process.is_alive():
+                process.terminate()
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+SWEEP_KEYS = ("input_units", "optimizer", "batch_size", "input_epochs")
+
+# rough resident size of one worker process with keras and a backend imported
+WORKER_OVERHEAD_BYTES = 400 * 1024 ** 2
+
+
+def apply_hyperparameters (spec, params: dict):
+    """Returns `spec` with `input_units` applied to every layer with units except the output layer."""
+
+    if "input_units" not in params:
+        return spec
+
+    layers = list(spec.layers)
+    with_units = [i for i, layer in enumerate(layers) if "units" in dict(layer.config)]
+
+    for i in with_units[:-1]:
+        layers[i] = LayerSpec.of(layers[i].class_name, **{**dict(layers[i].config), "units": int(params["input_units"])})
+
+    return replace(spec, layers=tuple(layers))
+
+
+def build_trial_model (spec, params: dict, compile_settings: dict):
+    model = apply_hyperparameters(spec, params).materialize()
+    model.compile(
+        optimizer=params.get("optimizer", compile_settings["optimizer"]),
+        loss=compile_settings["loss"],
+        metrics=[compile_settings["metrics"]] if compile_settings["metrics"] else None,
+    )
+    return model
+
+
+def _sweep_init (threads: int):
+    _limit_threads(threads)
+
+
+def _sweep_trial (spec, params: dict, compile_settings: dict, x_path: str, y_path: str, validation_split: float, epochs: int, initial_epoch: int, weights):
+    """Trains one trial from `initial_epoch` up to `epochs` and returns its score and weights."""
+
+    x = np.load(x_path, mmap_mode="r")
+    y = np.load(y_path, mmap_mode="r") if y_path else None
+
+    model = build_trial_model(spec, params, compile_settings)
+    if weights is not None:
+        model.set_weights(weights)
+
+    begin = time.perf_counter()
+    history = model.fit(
+        x, y,
+        batch_size=int(params["batch_size"]),
+        epochs=epochs,
+        initial_epoch=initial_epoch,
+        validation_split=validation_split,
+        verbose=0,
+    )
+    seconds = time.perf_counter() - begin
+
+    logs = {name: float(values[-1]) for name, values in history.history.items()}
+    score = logs.get("val_loss", logs.get("loss", math.inf))
+
+    return score, logs, model.get_weights(), seconds
+
+
+def sweep_grid (search_space: dict, defaults: dict, max_trials: int, seed: int = 0):
+    unknown = [key for key in search_space if key not in SWEEP_KEYS]
+    if unknown:
+        raise ValueError(f"Unknown search space keys {unknown}, expected any of {list(SWEEP_KEYS)}")
+
+    space = {key: list(values) if isinstance(values, (list, tuple)) else [values] for key, values in search_space.items()}
+    names = list(space)
+    trials = [dict(defaults, **dict(zip(names, values))) for values in itertools.product(*(space[n] for n in names))]
+
+    if max_trials and len(trials) > max_trials:
+        trials = random.Random(seed).sample(trials, max_trials)
+
+    return trials
+
+
+def sweep_workers (requested: int, data_bytes: int, memory_budget: int) -> int:
+    """Number of concurrent trials that fit the CPU count and the memory budget."""
+
+    # keras copies the (memory-mapped) arrays into backend tensors, once per trial process
+    per_trial = WORKER_OVERHEAD_BYTES + data_bytes
+    by_memory = max(1, min(memory_budget, available_memory()) // per_trial)
+    cpus = os.cpu_count() or 1
+    return int(max(1, min(requested or cpus, cpus, by_memory)))
+
+
+def run_sweep (
+    spec,
+    x: np.ndarray,
+    y: np.ndarray,
+    search_space: dict,
+    compile_settings: dict,
+    defaults: dict,
+    validation_split: float = 0.2,
+    reduction_factor: int = 3,
+    min_epochs: int = 1,
+    max_trials: int = 0,
+    workers: int = 0,
+    memory_budget: int = 4 * 1024 ** 3,
+    seed: int = 0,
+):
+    """Successive halving over a grid of trials, run concurrently in a spawn process pool.
+
+    All trials train for `min_epochs`; the best 1 / `reduction_factor` are continued from
+    their weights (with a fresh optimizer state) for `reduction_factor` times as many
+    epochs, and so on until the trials reach their own `input_epochs`. Returns one result
+    row per trial (best first), the best trial's state and the number of workers used.
+    """
+
+    trials = sweep_grid(search_space, defaults, max_trials, seed)
+    reduction_factor = max(2, reduction_factor)
+    max_epochs = max(int(trial["input_epochs"]) for trial in trials)
+
+    workers = sweep_workers(workers, x.nbytes + (y.nbytes if y is not None else 0), memory_budget)
+    threads = max(1, (os.cpu_count() or 1) // workers)
+
+    states = [dict(trial=i, params=trial, epochs=0, score=math.inf, logs={}, weights=None, seconds=0.0, rung=0) for i, trial in enumerate(trials)]
+    alive = list(states)
+    budget = max(1, min_epochs)
+    rung = 0
+
+    directory = tempfile.mkdtemp(prefix="keras_sweep_")
+
+    try:
+        x_path = os.path.join(directory, "x.npy")
+        np.save(x_path, x)
+        y_path = ""
+        if y is not None:
+            y_path = os.path.join(directory, "y.npy")
+            np.save(y_path, y)
+
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=_sweep_init, initargs=(threads,)) as pool:
+            while alive:
+                futures = {}
+                for state in alive:
+                    target = min(budget, int(state["params"]["input_epochs"]))
+                    if target <= state["epochs"]:
+                        continue
+                    futures[state["trial"]] = pool.submit(
+                        _sweep_trial, spec, state["params"], compile_settings, x_path, y_path,
+                        validation_split, target, state["epochs"], state["weights"],
+                    )
+
+                for state in alive:
+                    state["rung"] = rung
+                    future = futures.get(state["trial"])
+                    if future is None:
+                        # already at its own epoch count, it competes with its last score
+                        continue
+                    state["score"], state["logs"], state["weights"], seconds = future.result()
+                    state["epochs"] = min(budget, int(state["params"]["input_epochs"]))
+                    state["seconds"] += seconds
+
+                if budget >= max_epochs:
+                    break
+
+                # successive halving: only the best fraction continues with a larger budget
+                alive.sort(key=lambda state: state["score"])
+                alive = alive[:max(1, len(alive) // reduction_factor)]
+                budget = min(max_epochs, budget * reduction_factor)
+                rung += 1
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+    ranked = sorted(states, key=lambda state: (-state["rung"], state["score"]))
+    rows = [
+        dict(
+            rank=rank + 1,
+            trial=state["trial"],
+            **{key: state["params"].get(key) for key in SWEEP_KEYS},
+            epochs_trained=state["epochs"],
+            rung=state["rung"],
+            score=state["score"],
+            **state["logs"],
+            seconds=state["seconds"],
+        )
+        for rank, state in enumerate(ranked)
+    ]
+    return rows, ranked[0], workers
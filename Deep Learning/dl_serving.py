@@ -0,0 +1,260 @@
+"""
+Copyright (c) 2025 Authors
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is furnished
+to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED,
+INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A
+PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+Author: James Guana
+"""
+
+# Micro-batching inference: requests from many threads are coalesced on an asyncio
+# loop into one predict_on_batch call. Services outlive a flow run, so they are kept
+# in SERVICES here rather than on a component.
+
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import asyncio
+import json
+import threading
+import time
+
+import numpy as np
+
+
+def _bucket (rows: int, max_batch_size: int) -> int:
+    # pad to powers of two so jit backends trace a handful of batch shapes, not one per size
+    size = 1
+    while size < rows:
+        size *= 2
+    return min(max(size, rows), max(max_batch_size, rows))
+
+
+class MicroBatcher:
+    """Coalesces concurrent prediction requests into batches of up to `max_batch_size` rows.
+
+    A batch is dispatched once it is full or `max_wait_ms` after its first request arrived.
+    The model runs on a single executor thread, so the event loop keeps collecting the
+    next batch while the current one is computed.
+    """
+
+    def __init__ (self, model, max_batch_size: int = 64, max_wait_ms: float = 5.0, dtype=np.float32, history: int = 10000):
+        self.model = model
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        self.dtype = dtype
+        self.latencies = deque(maxlen=history)
+        self.batch_rows = deque(maxlen=history)
+        self.requests = 0
+        try:
+            self.sample_shape = tuple(model.input_shape[1:])
+        except (AttributeError, ValueError):
+            self.sample_shape = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="keras-serve-model")
+        self._loop = asyncio.new_event_loop()
+        self._ready = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="keras-serve-loop", daemon=True)
+        self._thread.start()
+        self._ready.wait()
+
+    def _run (self):
+        asyncio.set_event_loop(self._loop)
+        self._queue = asyncio.Queue()
+        self._loop.create_task(self._dispatch())
+        self._ready.set()
+        self._loop.run_forever()
+
+    def validate (self, x) -> np.ndarray:
+        """`x` as a (rows, *sample shape) array; raises ValueError for anything else."""
+
+        try:
+            x = np.asarray(x, dtype=self.dtype)
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"Inputs are not numeric: {e}") from e
+        if x.ndim < 2 or len(x) == 0:
+            raise ValueError(f"Inputs should be a non-empty list of samples, got shape {x.shape}.")
+        if self.sample_shape is not None and (
+            len(x.shape[1:]) != len(self.sample_shape)
+            or any(expected is not None and dim != expected for dim, expected in zip(x.shape[1:], self.sample_shape))
+        ):
+            raise ValueError(f"Samples should have shape {self.sample_shape}, got {x.shape[1:]}.")
+        return x
+
+    async def submit (self, x: np.ndarray) -> np.ndarray:
+        x = self.validate(x)
+        future = self._loop.create_future()
+        await self._queue.put((x, future, time.perf_counter()))
+        return await future
+
+    def predict (self, x: np.ndarray, timeout: float = None) -> np.ndarray:
+        """Thread-safe blocking entry point used by the HTTP handler and by tests."""
+
+        return asyncio.run_coroutine_threadsafe(self.submit(x), self._loop).result(timeout)
+
+    async def _dispatch (self):
+        while True:
+            pending = [await self._queue.get()]
+            rows = len(pending[0][0])
+            deadline = self._loop.time() + self.max_wait
+
+            while rows < self.max_batch_size:
+                remaining = deadline - self._loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), remaining)
+                except asyncio.TimeoutError:
+                    break
+                pending.append(item)
+                rows += len(item[0])
+
+            try:
+                batch = np.concatenate([item[0] for item in pending])
+                size = _bucket(len(batch), self.max_batch_size)
+                if size > len(batch):
+                    batch = np.concatenate([batch, np.zeros((size - len(batch), *batch.shape[1:]), dtype=batch.dtype)])
+
+                outputs = await self._loop.run_in_executor(self._executor, self.model.predict_on_batch, batch)
+                outputs = np.asarray(outputs)
+            except Exception as e:
+                # the error belongs to this batch's requests; the dispatcher keeps serving
+                for _, future, _ in pending:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            done = time.perf_counter()
+            self.batch_rows.append(rows)
+            offset = 0
+            for x, future, arrived in pending:
+                if not future.done():
+                    future.set_result(outputs[offset:offset + len(x)])
+                offset += len(x)
+                self.latencies.append(done - arrived)
+                self.requests += 1
+
+    def stats (self) -> dict:
+        latencies = np.asarray(self.latencies) * 1000.0
+        rows = np.asarray(self.batch_rows, dtype=np.float64)
+        return dict(
+            requests=self.requests,
+            batches=len(rows),
+            max_batch_size=self.max_batch_size,
+            max_wait_ms=self.max_wait * 1000.0,
+            latency_p50_ms=float(np.percentile(latencies, 50)) if len(latencies) else None,
+            latency_p99_ms=float(np.percentile(latencies, 99)) if len(latencies) else None,
+            mean_batch_rows=float(rows.mean()) if len(rows) else None,
+            mean_batch_fill=float(rows.mean() / self.max_batch_size) if len(rows) else None,
+        )
+
+    def close (self):
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+        self._executor.shutdown(wait=False)
+
+
+def _handler (batcher: MicroBatcher):
+    class Handler (BaseHTTPRequestHandler):
+        def _reply (self, code: int, payload: dict):
+            body = json.dumps(payload).encode()
+            self.send_response(code)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET (self):
+            if self.path.rstrip("/") == "/stats":
+                self._reply(200, batcher.stats())
+            else:
+                self._reply(404, {"error": "use POST /predict or GET /stats"})
+
+        def do_POST (self):
+            if self.path.rstrip("/") != "/predict":
+                self._reply(404, {"error": "use POST /predict or GET /stats"})
+                return
+            try:
+                request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+                outputs = batcher.predict(np.asarray(request["inputs"]))
+                self._reply(200, {"outputs": outputs.tolist()})
+            except (KeyError, ValueError, TypeError) as e:
+                self._reply(400, {"error": str(e)})
+            except Exception as e:
+                self._reply(500, {"error": str(e)})
+
+        def log_message (self, format, *args):
+            pass
+
+    return Handler
+
+
+class InferenceService:
+    """A MicroBatcher with an optional local HTTP endpoint (POST /predict, GET /stats)."""
+
+    def __init__ (self, model, max_batch_size: int, max_wait_ms: float, dtype, host: str = "", port: int = 0):
+        self.model = model
+        self.batcher = MicroBatcher(model, max_batch_size, max_wait_ms, dtype)
+        self.server = None
+        self.url = None
+
+        if host:
+            self.server = ThreadingHTTPServer((host, port), _handler(self.batcher))
+            self.server.daemon_threads = True
+            threading.Thread(target=self.server.serve_forever, name="keras-serve-http", daemon=True).start()
+            self.url = f"http://{host}:{self.server.server_address[1]}"
+
+    def close (self):
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+        self.batcher.close()
+
+
+# service name -> InferenceService
+SERVICES = {}
+_services_lock = threading.Lock()
+
+
+def start_service (name: str, model, max_batch_size: int, max_wait_ms: float, dtype, host: str = "", port: int = 0) -> InferenceService:
+    """Starts the named service, replacing a running one whose model or settings differ."""
+
+    with _services_lock:
+        service = SERVICES.get(name)
+        if service is not None:
+            batcher = service.batcher
+            same = (
+                service.model is model
+                and batcher.max_batch_size == max(1, max_batch_size)
+                and batcher.max_wait == max(0.0, max_wait_ms) / 1000.0
+                and (service.url is not None) == bool(host)
+            )
+            if same:
+                return service
+            service.close()
+
+        service = InferenceService(model, max_batch_size, max_wait_ms, dtype, host, port)
+        SERVICES[name] = service
+        return service
+
+
+def stop_service (name: str) -> bool:
+    with _services_lock:
+        service = SERVICES.pop(name, None)
+    if service is None:
+        return False
+    service.close()
+    return True
@@ -0,0 +1,1063 @@
+"""
+Copyright (c) 2025 Authors
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is furnished
+to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED,
+INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A
+PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+Author: James Guana
+"""
+
+# Shared helpers for the Deep Learning components. Langflow re-executes component
+# source on every build, so anything that must outlive a single run (caches,
+# registries) lives here, in an importable module.
+
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+import gc
+import glob
+import hashlib
+import io
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import warnings
+import zipfile
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+SHAPE_SAMPLE_ROWS = 1024
+
+
+def available_memory () -> int:
+    try:
+        import psutil
+        return psutil.virtual_memory().available
+    except ImportError:
+        return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+
+
+def _hash_cells (column, digest):
+    # list/array cells are not hashable by pandas: hash their lengths and flattened values
+    cells = column.to_numpy()
+    try:
+        digest.update(np.array([np.size(cell) for cell in cells], dtype=np.int64).tobytes())
+        digest.update(np.concatenate([np.ravel(np.asarray(cell)) for cell in cells]).tobytes())
+    except (TypeError, ValueError):
+        digest.update(repr(cells.tolist()).encode())
+
+
+def fingerprint_frame (frame) -> str:
+    """Content hash of a frame: shape, columns, dtypes, index and every value.
+
+    Used to key caches whose stale hits would return wrong results, so no rows are skipped.
+    """
+
+    if frame is None:
+        return "none"
+
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(repr((frame.shape, list(frame.columns), [str(t) for t in frame.dtypes])).encode())
+
+    try:
+        digest.update(pd.util.hash_pandas_object(frame, index=True).values.tobytes())
+    except TypeError:
+        digest.update(pd.util.hash_pandas_object(frame.index).values.tobytes())
+        for _, column in frame.items():
+            try:
+                digest.update(pd.util.hash_pandas_object(column, index=False).values.tobytes())
+            except TypeError:
+                _hash_cells(column, digest)
+
+    return digest.hexdigest()
+
+
+def history_to_frame (history) -> pd.DataFrame:
+    metrics = dict(history.history) if history is not None else {}
+    epochs = list(getattr(history, "epoch", None) or range(len(next(iter(metrics.values()), []))))
+    table = pd.DataFrame({"epoch": [epoch + 1 for epoch in epochs]})
+    for name, values in metrics.items():
+        table[name] = np.asarray(values, dtype=np.float64)
+    return table
+
+
+def _stack_cells (column, dtype, name: str) -> np.ndarray:
+    cells = column.to_numpy()
+    try:
+        stacked = np.stack(cells)
+    except ValueError as e:
+        shapes = sorted({np.shape(cell) for cell in cells[:SHAPE_SAMPLE_ROWS]})
+        raise ValueError(f"Column '{column.name}' of input data ({name}) has cells of different shapes {shapes[:5]}.") from e
+    try:
+        return stacked.astype(dtype, copy=False)
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Column '{column.name}' of input data ({name}) is not numeric: {e}") from e
+
+
+def frame_to_array (frame, dtype=np.float32, name: str = "x") -> np.ndarray:
+    """Converts a DataFrame into a dense array without per-row Python work.
+
+    A single scalar column becomes a 1-D array, wide numeric frames a 2-D array and
+    list/array cells are stacked into extra trailing dimensions. Only a single numeric
+    column already stored in `dtype` is returned without a copy; pandas keeps the columns
+    of a wide frame apart, so those are always copied into one contiguous array. Nullable
+    columns (Int64, Float64, boolean) with missing values raise a ValueError instead of
+    turning into NaN.
+    """
+
+    if frame is None:
+        return None
+
+    if len(frame) == 0 or len(frame.columns) == 0:
+        raise ValueError(f"Input data ({name}) is empty.")
+
+    numeric = [pd.api.types.is_numeric_dtype(t) for t in frame.dtypes]
+
+    for column, column_dtype in zip(frame.columns, frame.dtypes):
+        if isinstance(column_dtype, pd.api.extensions.ExtensionDtype) and frame[column].hasnans:
+            raise ValueError(
+                f"Column '{column}' of input data ({name}) has {int(frame[column].isna().sum())} missing "
+                f"values ({column_dtype}); fill or drop them first."
+            )
+
+    if all(numeric):
+        if len(frame.columns) == 1:
+            array = frame.iloc[:, 0].to_numpy(dtype=dtype, copy=False)
+        else:
+            array = np.ascontiguousarray(frame.to_numpy(dtype=dtype, copy=False))
+        return array
+
+    parts = []
+    for column, is_numeric in zip(frame.columns, numeric):
+        series = frame[column]
+        if is_numeric:
+            parts.append(series.to_numpy(dtype=dtype, copy=False).reshape(-1, 1))
+            continue
+
+        first = series.iloc[0]
+        if not isinstance(first, (list, tuple, np.ndarray)):
+            raise ValueError(
+                f"Column '{column}' of input data ({name}) has dtype {series.dtype} "
+                f"({type(first).__name__} cells); expected numbers or lists/arrays of numbers."
+            )
+        parts.append(_stack_cells(series, dtype, name))
+
+    if len(parts) == 1:
+        return parts[0]
+
+    if any(part.ndim > 2 for part in parts):
+        shapes = [part.shape for part in parts]
+        raise ValueError(f"Cannot combine columns of input data ({name}) with shapes {shapes}; use a single array column.")
+
+    return np.concatenate(parts, axis=1)
+
+
+def sequence_lengths (frame):
+    """Lengths of the cells if `frame` is a single column of variable-length sequences, else None."""
+
+    if frame is None or len(frame.columns) != 1 or len(frame) == 0:
+        return None
+    series = frame.iloc[:, 0]
+    if pd.api.types.is_numeric_dtype(series.dtype) or not isinstance(series.iloc[0], (list, tuple, np.ndarray)):
+        return None
+    lengths = np.fromiter((len(cell) for cell in series.to_numpy()), dtype=np.int64, count=len(series))
+    return lengths if lengths.min() != lengths.max() else None
+
+
+def check_masking (model):
+    """Raises unless `model` masks padded steps, which bucketed sequence batches rely on."""
+
+    for layer in getattr(model, "layers", []):
+        if layer.__class__.__name__ == "Masking" or getattr(layer, "mask_zero", False):
+            return
+    raise ValueError(
+        "Variable-length sequences are padded per batch and need a Masking layer in front of the "
+        "recurrent layers; enable Masking in Keras Recurrent."
+    )
+
+
+def frame_to_sequences (frame, dtype=np.float32, name: str = "x") -> list:
+    """Converts a column of variable-length sequences into a list of (steps, features) arrays.
+
+    Cells are lists of numbers (one feature per step) or lists of equal-length lists.
+    """
+
+    sequences = []
+    for row, cell in enumerate(frame.iloc[:, 0].to_numpy()):
+        try:
+            sequence = np.asarray(cell, dtype=dtype)
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"Row {row} of input data ({name}) is not a numeric sequence: {e}") from e
+        sequences.append(sequence.reshape(len(sequence), -1))
+
+    features = {sequence.shape[1] for sequence in sequences if len(sequence)}
+    if len(features) > 1:
+        raise ValueError(f"Sequences of input data ({name}) have different feature counts {sorted(features)[:5]}.")
+    return sequences
+
+
+def check_samples (x, y):
+    if y is not None and len(x) != len(y):
+        raise ValueError(f"Input data (x) has {len(x)} samples but target data (y) has {len(y)}.")
+
+
+def file_fingerprint (*parts) -> str:
+    """Fingerprint of files (by path, size and mtime) plus any extra hashable parts."""
+
+    stats = []
+    for part in parts:
+        path = os.path.expanduser(part) if isinstance(part, str) else None
+        stats.append((path, os.path.getsize(path), os.path.getmtime(path)) if path and os.path.isfile(path) else part)
+    return hashlib.blake2b(repr(stats).encode(), digest_size=16).hexdigest()
+
+
+def open_array (path: str, key: str = "") -> np.ndarray:
+    """Opens a .npy file, or an array stored in a .npz archive, memory-mapped read-only.
+
+    Arrays stored uncompressed in a .npz archive are mapped in place; compressed
+    members cannot be mapped and are loaded into memory with a warning.
+    """
+
+    path = os.path.expanduser(path.strip())
+    if not os.path.isfile(path):
+        raise ValueError(f"Array file not found: {path}")
+
+    if not path.lower().endswith(".npz"):
+        return np.load(path, mmap_mode="r", allow_pickle=False)
+
+    with zipfile.ZipFile(path) as archive:
+        members = [name[:-4] for name in archive.namelist() if name.endswith(".npy")]
+        if not key:
+            if len(members) != 1:
+                raise ValueError(f"{path} contains arrays {members}; choose one with the array key.")
+            key = members[0]
+        if key not in members:
+            raise ValueError(f"Array '{key}' not found in {path}, available: {members}")
+
+        info = archive.getinfo(key + ".npy")
+
+        if info.compress_type != zipfile.ZIP_STORED:
+            warnings.warn(f"Array '{key}' in {path} is compressed and cannot be memory-mapped; loading it into memory.")
+            with archive.open(info) as f:
+                return np.lib.format.read_array(f, allow_pickle=False)
+
+        with open(path, "rb") as f:
+            # skip the local file header to reach the stored .npy payload
+            f.seek(info.header_offset + 26)
+            name_length, extra_length = np.frombuffer(f.read(4), dtype="<u2")
+            f.seek(info.header_offset + 30 + int(name_length) + int(extra_length))
+            version = np.lib.format.read_magic(f)
+            if version == (1, 0):
+                shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+            else:
+                shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+            offset = f.tell()
+
+    return np.memmap(path, dtype=dtype, mode="r", shape=shape, offset=offset, order="F" if fortran_order else "C")
+
+
+SOURCE_EXTENSIONS = (".parquet", ".pq", ".csv")
+
+
+def source_files (path: str) -> list:
+    """The Parquet/CSV shards of a data source: the file itself or every shard in a directory."""
+
+    path = os.path.expanduser(path.strip())
+
+    if os.path.isdir(path):
+        files = sorted(
+            f for f in glob.glob(os.path.join(path, "**", "*"), recursive=True)
+            if f.lower().endswith(SOURCE_EXTENSIONS)
+        )
+    elif os.path.isfile(path):
+        files = [path]
+    else:
+        raise ValueError(f"Data source not found: {path}")
+
+    if not files:
+        raise ValueError(f"No Parquet or CSV shards found in {path}")
+
+    return files
+
+
+class ChunkedSource:
+    """Row-chunk index over a Parquet/CSV file or a directory of such shards.
+
+    Parquet files are split along their row groups, CSV files into chunks of
+    `chunk_rows` rows whose byte offsets are recorded once, so any chunk can be
+    read back without touching the rest of the file. Indexing a CSV file reads all
+    of it, so use `open` to reuse the index of unchanged files.
+    """
+
+    def __init__ (self, path: str, chunk_rows: int = 65536):
+        files = source_files(path)
+
+        self.path = os.path.expanduser(path.strip())
+        self.files = files
+        self.chunk_rows = chunk_rows
+        self.chunks = []
+        self.columns = None
+
+        for file in files:
+            if file.lower().endswith(".csv"):
+                self._index_csv(file)
+            else:
+                self._index_parquet(file)
+
+        self.offsets = np.cumsum([0] + [chunk[-1] for chunk in self.chunks])
+
+    @classmethod
+    def open (cls, path: str, chunk_rows: int = 65536) -> "ChunkedSource":
+        """A source for `path`, reusing the index built earlier while its files are unchanged."""
+
+        key = (file_fingerprint(*source_files(path)), chunk_rows)
+        source = SOURCE_CACHE.get(key)
+        if source is None:
+            source = cls(path, chunk_rows)
+            SOURCE_CACHE.put(key, source)
+        return source
+
+    @property
+    def num_rows (self) -> int:
+        return int(self.offsets[-1])
+
+    def fingerprint (self) -> str:
+        return file_fingerprint(*self.files)
+
+    def _set_columns (self, columns, file):
+        columns = list(columns)
+        if self.columns is None:
+            self.columns = columns
+        elif columns != self.columns:
+            raise ValueError(f"Shard {file} has columns {columns}, expected {self.columns}")
+
+    def _index_parquet (self, file):
+        import pyarrow.parquet as pq
+
+        metadata = pq.ParquetFile(file).metadata
+        self._set_columns(metadata.schema.names, file)
+        for group in range(metadata.num_row_groups):
+            self.chunks.append(("parquet", file, group, metadata.row_group(group).num_rows))
+
+    def _index_csv (self, file):
+        with open(file, "rb") as f:
+            header = f.readline()
+            self._set_columns(pd.read_csv(io.BytesIO(header)).columns, file)
+            start, rows = f.tell(), 0
+            for line in iter(f.readline, b""):
+                if not line.strip():
+                    continue
+                rows += 1
+                if rows == self.chunk_rows:
+                    self.chunks.append(("csv", file, start, rows))
+                    start, rows = f.tell(), 0
+            if rows:
+                self.chunks.append(("csv", file, start, rows))
+
+    def read_chunk (self, index: int, columns=None) -> pd.DataFrame:
+        kind, file, position, rows = self.chunks[index]
+
+        if kind == "parquet":
+            import pyarrow.parquet as pq
+            return pq.ParquetFile(file).read_row_group(position, columns=columns).to_pandas()
+
+        with open(file, "rb") as f:
+            f.seek(position)
+            frame = pd.read_csv(f, header=None, names=self.columns, nrows=rows)
+        return frame if columns is None else frame[columns]
+
+
+def iter_chunks (x, chunk_rows: int):
+    """Yields consecutive row chunks of an array, or of the batches of a keras PyDataset."""
+
+    if isinstance(x, np.ndarray):
+        for start in range(0, len(x), chunk_rows):
+            yield x[start:start + chunk_rows]
+        return
+
+    pending, rows = [], 0
+    for index in range(len(x)):
+        batch = x[index]
+        batch = batch[0] if isinstance(batch, tuple) else batch
+        pending.append(batch)
+        rows += len(batch)
+        if rows >= chunk_rows:
+            yield pending[0] if len(pending) == 1 else np.concatenate(pending)
+            pending, rows = [], 0
+    if pending:
+        yield pending[0] if len(pending) == 1 else np.concatenate(pending)
+
+
+def prediction_columns (predictions: np.ndarray):
+    """Flattens (n, ...) predictions to (n, k) float32 with column names y_pred or y_pred_<i>."""
+
+    table = np.asarray(predictions, dtype=np.float32).reshape(len(predictions), -1)
+    if table.shape[1] == 1:
+        return table, ["y_pred"]
+    return table, [f"y_pred_{i}" for i in range(table.shape[1])]
+
+
+class PredictionWriter:
+    """Writes prediction chunks to a .npy or .parquet file as they are produced."""
+
+    def __init__ (self, path: str, num_rows: int):
+        self.path = os.path.expanduser(path.strip())
+        self.num_rows = num_rows
+        self.rows = 0
+        self._array = None
+        self._writer = None
+
+        if not self.path.lower().endswith((".npy", ".parquet")):
+            raise ValueError("Prediction file should end with .npy or .parquet")
+
+    def write (self, predictions: np.ndarray):
+        if self.path.lower().endswith(".npy"):
+            if self._array is None:
+                self._array = np.lib.format.open_memmap(
+                    self.path, mode="w+", dtype=np.float32, shape=(self.num_rows, *predictions.shape[1:])
+                )
+            self._array[self.rows:self.rows + len(predictions)] = predictions
+        else:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            table, columns = prediction_columns(predictions)
+            batch = pa.table({name: table[:, i] for i, name in enumerate(columns)})
+            if self._writer is None:
+                self._writer = pq.ParquetWriter(self.path, batch.schema)
+            self._writer.write_table(batch)
+
+        self.rows += len(predictions)
+
+    def close (self):
+        if self._array is not None:
+            self._array.flush()
+            self._array = None
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+
+class MemoryAwareCache:
+    """LRU cache that evicts beyond `max_entries`, beyond `max_bytes` of entry sizes and
+    while free system memory is below `min_free_bytes`."""
+
+    def __init__ (self, max_entries: int = 8, min_free_bytes: int = 512 * 1024 ** 2, max_bytes: int = None):
+        self.max_entries = max_entries
+        self.min_free_bytes = min_free_bytes
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get (self, key):
+        with self._lock:
+            if key not in self._entries:
+                return None
+            self._entries.move_to_end(key)
+            return self._entries[key][0]
+
+    def put (self, key, value, size: int = 0):
+        with self._lock:
+            if key in self._entries:
+                self.total_bytes -= self._entries[key][1]
+            self._entries[key] = (value, size)
+            self.total_bytes += size
+            self._entries.move_to_end(key)
+            self._evict()
+
+    def pop (self, key):
+        with self._lock:
+            value, size = self._entries.pop(key, (None, 0))
+            self.total_bytes -= size
+            return value
+
+    def discard_where (self, predicate):
+        with self._lock:
+            for key in [key for key in self._entries if predicate(key)]:
+                self.total_bytes -= self._entries.pop(key)[1]
+
+    def discard_values_where (self, predicate):
+        with self._lock:
+            for key in [key for key, (value, _) in self._entries.items() if predicate(value)]:
+                self.total_bytes -= self._entries.pop(key)[1]
+
+    def values (self) -> list:
+        with self._lock:
+            return [value for value, _ in self._entries.values()]
+
+    def clear (self):
+        with self._lock:
+            self._entries.clear()
+            self.total_bytes = 0
+
+    def __len__ (self):
+        return len(self._entries)
+
+    def _evict_oldest (self):
+        _, size = self._entries.popitem(last=False)[1]
+        self.total_bytes -= size
+
+    def _evict (self):
+        while len(self._entries) > self.max_entries:
+            self._evict_oldest()
+        # keep the most recent entry even when it alone exceeds the budget
+        while len(self._entries) > 1 and self.max_bytes is not None and self.total_bytes > self.max_bytes:
+            self._evict_oldest()
+        while len(self._entries) > 1 and available_memory() < self.min_free_bytes:
+            self._evict_oldest()
+
+
+def _strip_names (config):
+    # auto-generated layer and optimizer names (dense_3, adam_1, ...) differ between otherwise identical runs
+    if isinstance(config, dict):
+        return {k: _strip_names(v) for k, v in config.items() if k != "name"}
+    if isinstance(config, (list, tuple)):
+        return [_strip_names(v) for v in config]
+    return config
+
+
+def architecture_fingerprint (backend: str, model_config, compile_settings: dict) -> str:
+    payload = json.dumps(
+        [backend, _strip_names(model_config), _strip_names(compile_settings)],
+        sort_keys=True,
+        default=repr,
+    )
+    return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+
+
+def model_nbytes (model) -> int:
+    return sum(np.asarray(w).nbytes for w in model.get_weights())
+
+
+def snapshot_state (model):
+    """Weights and optimizer variables of a compiled model, to rewind it before retraining."""
+
+    optimizer = getattr(model, "optimizer", None)
+    optimizer_values = [np.array(v.numpy()) for v in optimizer.variables] if optimizer is not None else []
+    return model.get_weights(), optimizer_values
+
+
+def restore_state (model, state):
+    weights, optimizer_values = state
+    model.set_weights(weights)
+    if optimizer_values:
+        for variable, value in zip(model.optimizer.variables, optimizer_values):
+            variable.assign(value)
+
+
+def save_checkpoint (directory: str, model, meta: dict):
+    """Writes weights, optimizer variables and `meta` to `directory`, replacing the files atomically."""
+
+    os.makedirs(directory, exist_ok=True)
+    weights, optimizer_values = snapshot_state(model)
+    arrays = {f"w{i}": w for i, w in enumerate(weights)}
+    arrays.update({f"o{i}": v for i, v in enumerate(optimizer_values)})
+
+    state_path = os.path.join(directory, "checkpoint.npz")
+    meta_path = os.path.join(directory, "checkpoint.json")
+
+    with open(state_path + ".tmp", "wb") as f:
+        np.savez(f, **arrays)
+    os.replace(state_path + ".tmp", state_path)
+
+    meta = dict(meta, weights=len(weights), optimizer_variables=len(optimizer_values))
+    with open(meta_path + ".tmp", "w") as f:
+        json.dump(meta, f)
+    os.replace(meta_path + ".tmp", meta_path)
+
+
+def load_checkpoint (directory: str, model):
+    """Restores a checkpoint written by save_checkpoint into `model`; returns its meta or None."""
+
+    state_path = os.path.join(directory, "checkpoint.npz")
+    meta_path = os.path.join(directory, "checkpoint.json")
+
+    if not (os.path.isfile(state_path) and os.path.isfile(meta_path)):
+        return None
+
+    with open(meta_path) as f:
+        meta = json.load(f)
+
+    optimizer = getattr(model, "optimizer", None)
+    if meta["optimizer_variables"] and optimizer is not None and not optimizer.built:
+        optimizer.build(model.trainable_variables)
+
+    with np.load(state_path) as arrays:
+        weights = [arrays[f"w{i}"] for i in range(meta["weights"])]
+        optimizer_values = [arrays[f"o{i}"] for i in range(meta["optimizer_variables"])]
+
+    restore_state(model, (weights, optimizer_values))
+    return meta
+
+
+def store_weights (directory: str, weights):
+    """Writes each array to `directory` as <content hash>.npy, skipping arrays already stored.
+
+    Returns the list of hashes and the number of arrays that were newly written.
+    """
+
+    os.makedirs(directory, exist_ok=True)
+    hashes, written = [], 0
+
+    for weight in weights:
+        weight = np.ascontiguousarray(weight)
+        digest = hashlib.sha256(repr((weight.dtype.str, weight.shape)).encode())
+        digest.update(memoryview(weight).cast("B"))
+        name = digest.hexdigest()
+        path = os.path.join(directory, name + ".npy")
+
+        if not os.path.isfile(path):
+            with open(path + ".tmp", "wb") as f:
+                np.save(f, weight)
+            os.replace(path + ".tmp", path)
+            written += 1
+
+        hashes.append(name)
+
+    return hashes, written
+
+
+def open_weights (directory: str, hashes):
+    """Memory-maps stored weights; the page cache is shared by every process loading them."""
+
+    return [np.load(os.path.join(directory, name + ".npy"), mmap_mode="r") for name in hashes]
+
+
+# (file fingerprint, chunk rows) -> ChunkedSource
+SOURCE_CACHE = MemoryAwareCache(max_entries=16)
+
+# (id(model), data fingerprints, epochs, batch size, workers) -> (model, history table, performance table)
+FIT_CACHE = MemoryAwareCache()
+
+# architecture fingerprint -> (compiled model, initial state)
+MODEL_CACHE = MemoryAwareCache(
+    max_entries=16,
+    max_bytes=int(os.environ.get("LANGFLOW_KERAS_MODEL_CACHE_MB", "1024")) * 1024 ** 2,
+)
+
+
+class ArrayDiskCache:
+    """Converted arrays kept as .npy files across runs and processes, reopened memory-mapped.
+
+    Entries are keyed by the `fingerprint_frame` content hash. Once the files exceed
+    `max_bytes`, the least recently used ones (by mtime, refreshed on every hit) are
+    deleted.
+    """
+
+    def __init__ (self, directory: str, max_bytes: int):
+        self.directory = os.path.expanduser(directory)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+    def path (self, frame, dtype, name: str) -> str:
+        key = hashlib.blake2b(repr((fingerprint_frame(frame), np.dtype(dtype).str, name)).encode(), digest_size=16)
+        return os.path.join(self.directory, key.hexdigest() + ".npy")
+
+    def convert (self, frame, dtype=np.float32, name: str = "x") -> np.ndarray:
+        """frame_to_array, served from the cache when the same frame was converted before."""
+
+        # plain numeric dtypes only; extension types such as bfloat16 do not round-trip through .npy
+        if frame is None or self.max_bytes <= 0 or np.dtype(dtype).kind not in "fiub":
+            return frame_to_array(frame, dtype=dtype, name=name)
+
+        path = self.path(frame, dtype, name)
+        try:
+            array = np.load(path, mmap_mode="r")
+            os.utime(path)
+            return array
+        except (FileNotFoundError, ValueError):
+            pass
+
+        array = frame_to_array(frame, dtype=dtype, name=name)
+        if array.nbytes > self.max_bytes:
+            return array
+
+        os.makedirs(self.directory, exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            np.save(f, array)
+        os.replace(tmp, path)
+        self.evict()
+        return array
+
+    def evict (self):
+        with self._lock:
+            entries = []
+            for path in glob.glob(os.path.join(self.directory, "*.npy")):
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                total -= size
+
+    def clear (self):
+        for path in glob.glob(os.path.join(self.directory, "*.npy")):
+            os.remove(path)
+
+
+ARRAY_CACHE = ArrayDiskCache(
+    os.environ.get("LANGFLOW_KERAS_ARRAY_CACHE_DIR", os.path.join("~", ".cache", "langflow-keras", "arrays")),
+    int(os.environ.get("LANGFLOW_KERAS_ARRAY_CACHE_MB", "4096")) * 1024 ** 2,
+)
+
+
+def flow_owner (component) -> str:
+    """Id of the flow a component runs in, used as the owner of the models it creates."""
+
+    try:
+        return str(component.flow_id or "")
+    except Exception:
+        return ""
+
+
+def release_backend_memory (backend: str):
+    """Frees what the backend holds beyond live models: keras' global state and allocator caches."""
+
+    gc.collect()
+    keras = sys.modules.get("keras")
+    if keras is not None and active_backend() == backend:
+        keras.backend.clear_session(free_memory=True)
+    if backend == "torch" and "torch" in sys.modules:
+        torch = sys.modules["torch"]
+        if torch.cuda.is_available():
+            torch.cuda.empty_cache()
+
+
+@dataclass
+class ModelEntry:
+    model: object
+    owner: str
+    source: str
+    backend: str
+    nbytes: int
+    created: float
+    last_used: float
+
+
+class ModelRegistry:
+    """Tracks the models the components create, so they can be released per flow.
+
+    Releasing a model drops the registry's reference and every cache entry holding it;
+    the model itself is freed once no Data object on a component refers to it either.
+    Models idle for longer than `idle_seconds`, and the least recently used ones beyond
+    `max_models`, are released whenever a model is tracked.
+    """
+
+    def __init__ (self, idle_seconds: float = 1800.0, max_models: int = 32):
+        self.idle_seconds = idle_seconds
+        self.max_models = max_models
+        self._entries = OrderedDict()
+        self._lock = threading.RLock()
+
+    def track (self, model, owner: str = "", source: str = ""):
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(id(model))
+            if entry is not None and entry.model is model:
+                entry.last_used = now
+                entry.owner = entry.owner or owner
+                self._entries.move_to_end(id(model))
+            else:
+                import keras
+
+                self._entries[id(model)] = ModelEntry(model, owner, source, keras.backend.backend(), model_nbytes(model), now, now)
+        self.evict()
+        return model
+
+    def evict (self) -> int:
+        now = time.time()
+        with self._lock:
+            idle = [entry for entry in self._entries.values() if now - entry.last_used > self.idle_seconds]
+            excess = list(self._entries.values())[:max(0, len(self._entries) - self.max_models)]
+            return self._release(list({id(entry.model): entry for entry in idle + excess}.values()))
+
+    def release (self, model=None, owner: str = None, keep=None) -> int:
+        """Releases one model, every model of `owner`, or everything if neither is given,
+        except `keep`."""
+
+        with self._lock:
+            entries = [
+                entry for entry in self._entries.values()
+                if (model is None or entry.model is model) and (owner is None or entry.owner == owner)
+                and entry.model is not keep
+            ]
+            return self._release(entries)
+
+    def _release (self, entries: list) -> int:
+        backends = set()
+        released = len(entries)
+        while entries:
+            entry = self._entries.pop(id(entries.pop().model))
+            model = entry.model
+            FIT_CACHE.discard_values_where(lambda value: value[0] is model)
+            MODEL_CACHE.discard_values_where(lambda value: value[0] is model)
+            backends.add(entry.backend)
+        entry = model = None
+
+        for backend in backends:
+            # clear_session resets global keras state, so only once nothing on it is tracked
+            if not any(entry.backend == backend for entry in self._entries.values()):
+                release_backend_memory(backend)
+            else:
+                gc.collect()
+        return released
+
+    def clear (self):
+        with self._lock:
+            self._entries.clear()
+
+    def report (self) -> list:
+        now = time.time()
+        with self._lock:
+            cached = {id(value[0]) for value in FIT_CACHE.values() + MODEL_CACHE.values()}
+            return [
+                dict(
+                    name=entry.model.name,
+                    owner=entry.owner,
+                    source=entry.source,
+                    backend=entry.backend,
+                    weight_bytes=entry.nbytes,
+                    idle_seconds=round(now - entry.last_used, 1),
+                    age_seconds=round(now - entry.created, 1),
+                    cached=id(entry.model) in cached,
+                )
+                for entry in self._entries.values()
+            ]
+
+    def __len__ (self):
+        return len(self._entries)
+
+
+REGISTRY = ModelRegistry(
+    idle_seconds=float(os.environ.get("LANGFLOW_KERAS_IDLE_SECONDS", "1800")),
+    max_models=int(os.environ.get("LANGFLOW_KERAS_MAX_MODELS", "32")),
+)
+
+
+def active_backend ():
+    """Backend of the keras module currently imported, or None if keras is not loaded."""
+
+    keras = sys.modules.get("keras")
+    if keras is None:
+        return None
+    try:
+        return keras.backend.backend()
+    except AttributeError:
+        return None
+
+
+def select_backend (backend: str) -> bool:
+    """Makes `backend` the keras backend, purging keras only if another one is loaded.
+
+    Keras cannot switch backends once imported, so a change drops every keras module
+    (and keras-dependent helpers such as keras_streaming) from sys.modules together with
+    the cached models built on the old backend. Returns True if keras had to be purged.
+    """
+
+    current = active_backend()
+    os.environ["KERAS_BACKEND"] = backend
+
+    if current is None or current == backend:
+        return False
+
+    modules = [module for module in sys.modules if module.startswith("keras")]
+    for module in modules:
+        sys.modules.pop(module, None)
+    sys.modules.pop("tensorflow.python.trackable.data_structures", None)
+
+    FIT_CACHE.clear()
+    MODEL_CACHE.clear()
+    REGISTRY.clear()
+    gc.collect()
+
+    logger.info("Keras backend switched from %s to %s, modules removed: %d", current, backend, len(modules))
+    return True
+
+
+_warmup = {"thread": None, "backend": None, "seconds": None, "error": None}
+
+
+def start_warmup (backend: str = None):
+    """Imports keras and initializes `backend` in a background thread.
+
+    Opt-in through LANGFLOW_KERAS_WARMUP (a backend name, or 1 to use KERAS_BACKEND);
+    does nothing when it is unset or a warm-up already started.
+    """
+
+    setting = os.environ.get("LANGFLOW_KERAS_WARMUP", "").strip().lower()
+    if backend is None:
+        if setting in ("", "0", "false", "no"):
+            return None
+        backend = setting if setting in ("tensorflow", "torch", "jax") else os.environ.get("KERAS_BACKEND", "tensorflow")
+
+    if _warmup["thread"] is not None:
+        return _warmup["thread"]
+
+    def warmup ():
+        start = time.perf_counter()
+        try:
+            select_backend(backend)
+            import keras
+            # first op initializes the backend runtime (thread pools, allocators)
+            keras.ops.convert_to_numpy(keras.ops.zeros((1,)))
+        except Exception as e:
+            _warmup["error"] = repr(e)
+        _warmup["seconds"] = time.perf_counter() - start
+        if _warmup["error"]:
+            logger.warning("Keras warm-up (%s) failed after %.2fs: %s", backend, _warmup["seconds"], _warmup["error"])
+        else:
+            logger.info("Keras warm-up (%s) finished in %.2fs", backend, _warmup["seconds"])
+
+    _warmup["backend"] = backend
+    _warmup["thread"] = threading.Thread(target=warmup, name="keras-warmup", daemon=True)
+    _warmup["thread"].start()
+    return _warmup["thread"]
+
+
+def wait_for_warmup (timeout: float = None):
+    thread = _warmup["thread"]
+    if thread is not None:
+        thread.join(timeout)
+
+
+def warmup_report () -> dict:
+    thread = _warmup["thread"]
+    return {
+        "backend": _warmup["backend"],
+        "running": thread is not None and thread.is_alive(),
+        "seconds": _warmup["seconds"],
+        "error": _warmup["error"],
+    }
+
+
+def _freeze (value):
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    return value
+
+
+@dataclass(frozen=True)
+class LayerSpec:
+    """Immutable description of one keras layer: its class name and constructor arguments."""
+
+    class_name: str
+    config: tuple = ()
+
+    @classmethod
+    def of (cls, class_name: str, **config) -> "LayerSpec":
+        return cls(class_name, _freeze(config))
+
+    def build (self, keras, **overrides):
+        config = {**dict(self.config), **overrides}
+        if self.class_name == "Input":
+            return keras.Input(**config)
+        return getattr(keras.layers, self.class_name)(**config)
+
+
+@dataclass(frozen=True)
+class ModelSpec:
+    """Immutable, hashable Sequential architecture passed between the layer components.
+
+    Layer components return a new spec instead of mutating a shared model, so re-running
+    part of a flow or feeding two branches from one spec cannot corrupt either. The keras
+    model is only built by `materialize`, at compile time.
+    """
+
+    backend: str
+    layers: tuple = ()
+    dtype_policy: str = "float32"
+
+    def add (self, layer: LayerSpec) -> "ModelSpec":
+        return replace(self, layers=self.layers + (layer,))
+
+    def layer_configs (self):
+        return [(layer.class_name, dict(layer.config)) for layer in self.layers]
+
+    def fingerprint (self, compile_settings: dict = None) -> str:
+        return architecture_fingerprint(
+            self.backend, [self.dtype_policy, self.layer_configs()], compile_settings or {}
+        )
+
+    def materialize (self):
+        select_backend(self.backend)
+
+        import keras
+
+        model = keras.Sequential()
+        last = max((i for i, layer in enumerate(self.layers) if layer.class_name != "Input"), default=None)
+
+        for i, layer in enumerate(self.layers):
+            if self.dtype_policy == "float32":
+                model.add(layer.build(keras))
+            elif layer.class_name == "Input":
+                # inputs arrive already converted to the compute dtype, see input_dtype
+                model.add(layer.build(keras, dtype=keras.DTypePolicy(self.dtype_policy).compute_dtype))
+            else:
+                # the output layer stays float32 for numerically stable losses
+                model.add(layer.build(keras, dtype="float32" if i == last else self.dtype_policy))
+
+        return model
+
+
+def model_dtype_policy (model) -> str:
+    """Name of the dtype policy of the first computing layer (float32 for plain models)."""
+
+    for layer in getattr(model, "layers", []):
+        policy = getattr(layer, "dtype_policy", None)
+        if policy is not None:
+            return policy.name
+    return "float32"
+
+
+def input_dtype (model):
+    """NumPy dtype inputs should be converted to so they match the model's compute dtype."""
+
+    try:
+        dtype = str(model.inputs[0].dtype)
+    except (AttributeError, IndexError, TypeError, ValueError):
+        dtype = {"mixed_float16": "float16", "mixed_bfloat16": "bfloat16"}.get(model_dtype_policy(model), "float32")
+
+    if "bfloat16" in dtype:
+        import ml_dtypes
+        return ml_dtypes.bfloat16
+    if "float16" in dtype:
+        return np.float16
+    return np.float32
+
+
+def resolve_model (model):
+    """Builds a ModelSpec into a keras model; keras models are returned unchanged."""
+
+    return model.materialize() if isinstance(model, ModelSpec) else model
@@ -0,0 +1,355 @@
+"""
+Copyright (c) 2025 Authors
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is furnished
+to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED,
+INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A
+PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+Author: James Guana
+"""
+
+# Imported lazily, after the backend has been selected (and purged together with keras).
+
+import json
+import os
+import sys
+import time
+
+import keras
+import numpy as np
+
+from dl_utils import save_checkpoint
+
+
+def peak_rss ():
+    try:
+        import resource
+    except ImportError:
+        try:
+            import psutil
+            return psutil.Process().memory_info().peak_wset
+        except (ImportError, AttributeError):
+            return None
+
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def current_rss ():
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        pass
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+def _allocator_memory ():
+    backend = keras.backend.backend()
+    try:
+        if backend == "tensorflow":
+            import tensorflow as tf
+            if tf.config.list_logical_devices("GPU"):
+                return tf.config.experimental.get_memory_info("GPU:0")["current"]
+        if backend == "torch":
+            import torch
+            if torch.cuda.is_available():
+                return torch.cuda.memory_allocated()
+        if backend == "jax":
+            import jax
+            stats = jax.devices()[0].memory_stats()
+            return stats.get("bytes_in_use") if stats else None
+    except (ImportError, ValueError, RuntimeError, AttributeError):
+        return None
+    return None
+
+
+def backend_memory ():
+    """Bytes in use by the backend's accelerator allocator; on CPU, where backends keep no
+    such count, the resident set size of the process."""
+
+    memory = _allocator_memory()
+    return memory if memory is not None else current_rss()
+
+
+class PerformanceCallback (keras.callbacks.Callback):
+    """Records per-epoch timing, throughput and memory of a training run.
+
+    Step times are measured between the batch begin and end hooks; the gaps between one
+    step's end and the next step's begin are time spent waiting for input, so a large
+    `input_wait_seconds` share means the run is input-bound rather than compute-bound.
+    """
+
+    def __init__ (self, batch_size: int, num_samples: int = None, conversion_seconds: float = 0.0, log_path: str = ""):
+        super().__init__()
+        self.batch_size = batch_size
+        self.num_samples = num_samples
+        self.conversion_seconds = conversion_seconds
+        self.log_path = os.path.expanduser(log_path.strip()) if log_path else ""
+        self.records = []
+
+    def on_epoch_begin (self, epoch, logs=None):
+        self._epoch_start = time.perf_counter()
+        self._step_start = None
+        self._step_end = self._epoch_start
+        self._steps = []
+        self._waits = []
+
+    def on_train_batch_begin (self, batch, logs=None):
+        self._step_start = time.perf_counter()
+        self._waits.append(self._step_start - self._step_end)
+
+    def on_train_batch_end (self, batch, logs=None):
+        self._step_end = time.perf_counter()
+        self._steps.append(self._step_end - self._step_start)
+
+    def on_epoch_end (self, epoch, logs=None):
+        seconds = time.perf_counter() - self._epoch_start
+        steps = np.asarray(self._steps) if self._steps else np.zeros(1)
+        samples = self.num_samples or len(self._steps) * self.batch_size
+
+        record = dict(
+            epoch=epoch + 1,
+            epoch_seconds=seconds,
+            steps=len(self._steps),
+            step_seconds_mean=float(steps.mean()),
+            step_seconds_p50=float(np.percentile(steps, 50)),
+            step_seconds_p95=float(np.percentile(steps, 95)),
+            step_seconds_max=float(steps.max()),
+            input_wait_seconds=float(sum(self._waits)),
+            samples_per_second=samples / seconds if seconds else None,
+            conversion_seconds=self.conversion_seconds if epoch == 0 else 0.0,
+            peak_rss_bytes=peak_rss(),
+            backend_memory_bytes=backend_memory(),
+            **{name: float(value) for name, value in (logs or {}).items()},
+        )
+        self.records.append(record)
+
+        if self.log_path:
+            with open(self.log_path, "a") as f:
+                f.write(json.dumps(dict(record, timestamp=time.time(), backend=keras.backend.backend())) + "\n")
+
+
+def parse_step_window (window: str):
+    """Parses "start:stop" (global step numbers, stop exclusive) into a (start, stop) tuple."""
+
+    window = (window or "").replace(" ", "")
+    start, _, stop = window.partition(":")
+    try:
+        start = int(start) if start else 0
+        stop = int(stop) if stop else start + 10
+    except ValueError as e:
+        raise ValueError("Profile steps should be start:stop, e.g. 5:15.") from e
+    if stop <= start:
+        raise ValueError("Profile steps should end after they start.")
+    return start, stop
+
+
+def summarize_chrome_trace (path: str, top: int):
+    import gzip
+
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt") as f:
+        trace = json.load(f)
+
+    events = trace.get("traceEvents", trace) if isinstance(trace, dict) else trace
+    totals = {}
+    for event in events:
+        # "$file.py:line function" events are Python frames from the host tracer, not ops
+        if event.get("ph") == "X" and "dur" in event and not event.get("name", "$").startswith("$"):
+            calls, micros = totals.get(event["name"], (0, 0.0))
+            totals[event["name"]] = (calls + 1, micros + float(event["dur"]))
+
+    return [
+        dict(op=name, calls=calls, total_ms=micros / 1000.0, mean_us=micros / calls)
+        for name, (calls, micros) in sorted(totals.items(), key=lambda item: -item[1][1])[:top]
+    ]
+
+
+def _find_files (directory: str, suffixes):
+    found = []
+    for root, _, files in os.walk(directory):
+        found += [os.path.join(root, f) for f in files if f.endswith(suffixes)]
+    return sorted(found, key=os.path.getmtime)
+
+
+class ProfilerCallback (keras.callbacks.Callback):
+    """Runs the backend's profiler over a window of steps and writes the trace to `log_dir`.
+
+    Steps are counted across epochs and across repeated predict calls made with the same
+    callback; `finish` stops a profile still running and returns the top-N op summary.
+    tensorflow traces are summarized only when tensorboard-plugin-profile is installed.
+    """
+
+    def __init__ (self, log_dir: str, window: str = "", top: int = 20):
+        super().__init__()
+        self.log_dir = os.path.expanduser(log_dir.strip())
+        self.start_step, self.stop_step = parse_step_window(window)
+        self.top = top
+        self.backend = keras.backend.backend()
+        self.step = 0
+        self.running = False
+        self.done = False
+        self.ops = []
+        self.note = ""
+        self._torch_profile = None
+
+    def _begin (self):
+        if self.running or self.done or not self.start_step <= self.step < self.stop_step:
+            return
+
+        os.makedirs(self.log_dir, exist_ok=True)
+
+        if self.backend == "tensorflow":
+            import tensorflow as tf
+            tf.profiler.experimental.start(self.log_dir)
+        elif self.backend == "torch":
+            import torch
+            self._torch_profile = torch.profiler.profile(activities=[torch.profiler.ProfilerActivity.CPU], record_shapes=False)
+            self._torch_profile.start()
+        elif self.backend == "jax":
+            import jax
+            jax.profiler.start_trace(self.log_dir, create_perfetto_trace=True)
+
+        self.running = True
+
+    def _end (self):
+        self.step += 1
+        if self.running and self.step >= self.stop_step:
+            self.finish()
+
+    def on_train_batch_begin (self, batch, logs=None):
+        self._begin()
+
+    def on_train_batch_end (self, batch, logs=None):
+        self._end()
+
+    def on_predict_batch_begin (self, batch, logs=None):
+        self._begin()
+
+    def on_predict_batch_end (self, batch, logs=None):
+        self._end()
+
+    def finish (self):
+        if not self.running:
+            if not self.done and not self.note:
+                self.note = f"Profile window {self.start_step}:{self.stop_step} was never reached ({self.step} steps run)."
+            return self.ops
+
+        self.running = False
+        self.done = True
+
+        if self.backend == "tensorflow":
+            import tensorflow as tf
+            tf.profiler.experimental.stop()
+            self.ops = self._summarize_xplane()
+        elif self.backend == "torch":
+            profile = self._torch_profile
+            profile.stop()
+            profile.export_chrome_trace(os.path.join(self.log_dir, f"torch_{int(time.time())}.trace.json"))
+            averages = sorted(profile.key_averages(), key=lambda event: -event.self_cpu_time_total)[:self.top]
+            self.ops = [
+                dict(op=event.key, calls=event.count, total_ms=event.self_cpu_time_total / 1000.0, mean_us=event.self_cpu_time_total / max(event.count, 1))
+                for event in averages
+            ]
+        elif self.backend == "jax":
+            import jax
+            jax.profiler.stop_trace()
+            traces = _find_files(self.log_dir, (".trace.json.gz",))
+            self.ops = summarize_chrome_trace(traces[-1], self.top) if traces else []
+
+        return self.ops
+
+    def _summarize_xplane (self):
+        planes = _find_files(self.log_dir, (".xplane.pb",))
+        if not planes:
+            return []
+        try:
+            from tensorboard_plugin_profile.convert import raw_to_tool_data
+        except ImportError:
+            self.note = "Install tensorboard-plugin-profile to summarize tensorflow traces."
+            return []
+
+        data, _ = raw_to_tool_data.xspace_to_tool_data([planes[-1]], "trace_viewer", {})
+        trace_path = os.path.join(os.path.dirname(planes[-1]), "trace.json")
+        with open(trace_path, "w" if isinstance(data, str) else "wb") as f:
+            f.write(data)
+        return summarize_chrome_trace(trace_path, self.top)
+
+    def summary (self) -> dict:
+        return dict(backend=self.backend, trace_dir=self.log_dir, steps=f"{self.start_step}:{self.stop_step}", ops=self.ops, note=self.note)
+
+
+class CheckpointCallback (keras.callbacks.Callback):
+    """Saves weights and optimizer state every `frequency` epochs or steps.
+
+    With `best_only` an epoch checkpoint is only written when `monitor` improved. A
+    checkpoint records the epoch training should resume at: the next epoch after an
+    epoch checkpoint, the current one after a mid-epoch step checkpoint. Step checkpoints
+    are also written at the end of every epoch, so a completed run is not retrained.
+    """
+
+    def __init__ (self, directory: str, frequency: int = 1, unit: str = "epoch", best_only: bool = False, monitor: str = "val_loss", best: float = None):
+        super().__init__()
+        self.directory = directory
+        self.frequency = max(1, frequency)
+        self.unit = unit
+        self.best_only = best_only
+        self.monitor = monitor
+        self.best = best
+        self.epoch = 0
+        self.step = 0
+        self.saved = 0
+
+    def _save (self, resume_epoch: int, score=None):
+        save_checkpoint(
+            self.directory,
+            self.model,
+            dict(epoch=resume_epoch, step=self.step, best=self.best, monitor=self.monitor, score=score, time=time.time()),
+        )
+        self.saved += 1
+
+    def on_epoch_begin (self, epoch, logs=None):
+        self.epoch = epoch
+
+    def on_train_batch_end (self, batch, logs=None):
+        self.step += 1
+        if self.unit == "step" and self.step % self.frequency == 0:
+            self._save(self.epoch)
+
+    def on_epoch_end (self, epoch, logs=None):
+        if self.unit == "step":
+            # a finished epoch resumes at the next one, whatever step it ended on
+            self._save(epoch + 1)
+            return
+
+        if (epoch + 1) % self.frequency:
+            return
+
+        logs = logs or {}
+        score = logs.get(self.monitor, logs.get("loss"))
+
+        if self.best_only and score is not None:
+            if self.best is not None and score >= self.best:
+                return
+            self.best = float(score)
+
+        self._save(epoch + 1, None if score is None else float(score))
@@ -24,7 +24,10 @@ Author: James Guana
 from langflow.custom import Component
 from langflow.template import Input, Output
 from langflow.schema import Data
-from langflow.io import StrInput, DropdownInput
+from langflow.io import BoolInput, DropdownInput, IntInput, StrInput
+import time
+import numpy as np
+from dl_utils import MODEL_CACHE, REGISTRY, ModelSpec, architecture_fingerprint, flow_owner, model_dtype_policy, model_nbytes, restore_state, snapshot_state
 
 class KerasCompile (Component):
     display_name = "Keras Compile"
@@ -33,6 +36,10 @@ class KerasCompile (Component):
     icon = "compile"
     name = "KerasCompile"
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.compile_result = None
+
     inputs = [
         Input(
             name="input_model",
@@ -47,7 +54,6 @@ class KerasCompile (Component):
             display_name="Optimizer",
             info="Select the optimizer for model compilation.",
             options=[
-                "rmsprop"
                 "adam",
                 "sgd",
                 "rmsprop",
@@ -84,13 +90,61 @@ class KerasCompile (Component):
             ],
             value="None",
         ),
+        DropdownInput(
+            name="jit_compile",
+            display_name="JIT Compile",
+            info="Compile the train/predict steps with XLA (tensorflow, jax) or torch.compile (torch). "
+                 "auto lets keras decide for the backend.",
+            options=["auto", "True", "False"],
+            value="auto",
+            advanced=True,
+        ),
+        IntInput(
+            name="steps_per_execution",
+            display_name="Steps per Execution",
+            info="Number of batches run per compiled call, which cuts per-step Python overhead for small models.",
+            value=1,
+            advanced=True,
+        ),
+        BoolInput(
+            name="trace_on_compile",
+            display_name="Trace on Compile",
+            info="Trace the predict step once with a dummy batch so the report includes the trace time.",
+            value=False,
+            advanced=True,
+        ),
+        BoolInput(
+            name="use_model_cache",
+            display_name="Cache Compiled Model",
+            info="Start from a copy of the compiled model of an identical architecture from an earlier run.",
+            value=True,
+            advanced=True,
+        ),
+        BoolInput(
+            name="reuse_weights",
+            display_name="Reuse Trained Weights",
+            info="Keep the weights a cached model was trained to instead of resetting it to its initial weights.",
+            value=False,
+            advanced=True,
+        ),
     ]
 
     outputs = [
         Output(display_name="Compiled Model", name="output_model", method="compile_model"),
+        Output(display_name="Compile Report", name="report", method="compile_report"),
     ]
 
     def compile_model (self) -> Data:
+        model, _ = self.run_compile()
+        return Data(model=REGISTRY.track(model, flow_owner(self), self.name))
+
+    def compile_report (self) -> Data:
+        _, report = self.run_compile()
+        return Data(**report)
+
+    def run_compile (self):
+        if self.compile_result is not None:
+            return self.compile_result
 
         model = None
         metrics = None
@@ -106,15 +160,124 @@ class KerasCompile (Component):
         if self.input_metrics != "None":
             metrics = self.input_metrics
 
-        if self.input_loss != None:
+        if self.input_loss != "None":
             loss = self.input_loss
 
-        optimizer = self.optimizer  
-        
+        optimizer = self.optimizer
+        jit_compile = {"auto": "auto", "True": True, "False": False}[self.jit_compile]
+        steps_per_execution = max(1, self.steps_per_execution or 1)
+
+        compile_settings = dict(
+            optimizer=optimizer,
+            loss=loss,
+            metrics=metrics,
+            jit_compile=jit_compile,
+            steps_per_execution=steps_per_execution,
+        )
+        key = None
+
+        if self.use_model_cache:
+            if isinstance(model, ModelSpec):
+                # a spec is fingerprinted without building anything
+                key = model.fingerprint(compile_settings)
+            elif model.built:
+                import keras
+
+                key = architecture_fingerprint(
+                    keras.backend.backend(),
+                    model.get_config(),
+                    compile_settings,
+                )
+
+        if key is not None:
+            cached = MODEL_CACHE.get(key)
+
+            if cached is not None:
+                cached_model, initial_state = cached
+                state = snapshot_state(cached_model) if self.reuse_weights else initial_state
+                model = self.clone_compiled(cached_model, state)
+                self.compile_result = (model, self.build_report(model, cached=True))
+                return self.compile_result
+
+        start = time.perf_counter()
+
+        if isinstance(model, ModelSpec):
+            model = model.materialize()
+
+        build_seconds = time.perf_counter() - start
+
+        if model_dtype_policy(model) == "mixed_float16":
+            import keras
+
+            # float16 gradients underflow without loss scaling
+            optimizer = keras.optimizers.LossScaleOptimizer(keras.optimizers.get(optimizer))
+
+        # weighted, so zero-weight padding rows (see BucketedSequenceDataset) do not count;
+        # without sample weights they are the same as plain metrics
         model.compile(
-            optimizer=optimizer, 
-            loss=loss, 
-            metrics=[metrics]
+            optimizer=optimizer,
+            loss=loss,
+            weighted_metrics=[metrics] if metrics else None,
+            jit_compile=jit_compile,
+            steps_per_execution=steps_per_execution,
+        )
+
+        compile_seconds = time.perf_counter() - start - build_seconds
+
+        # an unbuilt model (no input layer) has no weights to snapshot yet
+        if key is not None and model.built:
+            model.optimizer.build(model.trainable_variables)
+            MODEL_CACHE.put(key, (model, snapshot_state(model)), size=3 * model_nbytes(model))
+
+        report = self.build_report(model, cached=False, build_seconds=build_seconds, compile_seconds=compile_seconds)
+        self.compile_result = (model, report)
+
+        return self.compile_result
+
+    def clone_compiled (self, model, state):
+        """A separate compiled copy of a cached model, set to `state`.
+
+        Cache hits get a copy so they never share or reset a model handed out earlier. The
+        model compiled on a miss is cached and returned itself: Fit trains it in place, and
+        those are the weights `reuse_weights` copies on later hits.
+        """
+
+        import keras
+
+        clone = keras.models.clone_model(model)
+        clone.compile_from_config(model.get_compile_config())
+        if not clone.optimizer.built:
+            clone.optimizer.build(clone.trainable_variables)
+        restore_state(clone, state)
+        return clone
+
+    def build_report (self, model, cached: bool, build_seconds: float = 0.0, compile_seconds: float = 0.0) -> dict:
+        import keras
+
+        report = dict(
+            backend=keras.backend.backend(),
+            cached=cached,
+            jit_compile=getattr(model, "jit_compile", None),
+            steps_per_execution=getattr(model, "steps_per_execution", None),
+            build_seconds=build_seconds,
+            compile_seconds=compile_seconds,
+            trace_seconds=None,
+            step_seconds=None,
         )
-        
-        return Data(model=model)
+
+        if self.trace_on_compile and model.built:
+            # variable (None) dimensions are traced with length 1
+            batch = np.zeros((1, *(dim or 1 for dim in model.input_shape[1:])), dtype=np.float32)
+
+            # the first call traces (and jit compiles) the predict step, the second one only runs it
+            start = time.perf_counter()
+            model.predict_on_batch(batch)
+            first = time.perf_counter() - start
+
+            start = time.perf_counter()
+            model.predict_on_batch(batch)
+            report["step_seconds"] = time.perf_counter() - start
+            report["trace_seconds"] = max(0.0, first - report["step_seconds"])
+
+        self.status = report
+        return report
@@ -0,0 +1,150 @@
+"""
+Copyright (c) 2025 Authors
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is furnished
+to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED,
+INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A
+PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+Author: James Guana
+"""
+
+from langflow.custom import Component
+from langflow.template import Output
+from langflow.schema import Data
+from langflow.io import BoolInput, FloatInput, IntInput, StrInput
+import re
+import numpy as np
+from dl_utils import file_fingerprint, open_array
+
+class KerasNumpyDataset (Component):
+    display_name = "Keras NumPy Dataset"
+    description = "Memory-maps .npy/.npz arrays for Keras Fit and Keras Predict without loading them into a DataFrame."
+    documentation = "https://numpy.org/doc/stable/reference/generated/numpy.load.html"
+    icon = "database"
+    name = "KerasNumpyDataset"
+
+    inputs = [
+        StrInput(
+            name="x_path",
+            display_name="Input Array (x)",
+            info="Path to a .npy file or .npz archive holding the input data.",
+            required=True,
+        ),
+        StrInput(
+            name="x_key",
+            display_name="Input Array Key",
+            info="Array name inside the .npz archive. Optional if the archive holds a single array.",
+            value="",
+            advanced=True,
+        ),
+        StrInput(
+            name="y_path",
+            display_name="Target Array (y)",
+            info="Path to a .npy file or .npz archive holding the target data. May be the same archive as x.",
+            value="",
+        ),
+        StrInput(
+            name="y_key",
+            display_name="Target Array Key",
+            info="Array name inside the .npz archive. Optional if the archive holds a single array.",
+            value="",
+            advanced=True,
+        ),
+        StrInput(
+            name="row_range",
+            display_name="Rows",
+            info="Optional row slice as start:stop, e.g. 0:100000. Leave empty to use all rows.",
+            value="",
+        ),
+        FloatInput(
+            name="validation_split",
+            display_name="Validation Split",
+            info="Fraction of the rows held out for the validation output.",
+            value=0.0,
+        ),
+        BoolInput(
+            name="shuffle_split",
+            display_name="Shuffle Split",
+            info="Pick validation rows at random instead of taking the last rows.",
+            value=False,
+        ),
+        IntInput(
+            name="seed",
+            display_name="Seed",
+            info="Seed of the random split.",
+            value=0,
+            advanced=True,
+        ),
+    ]
+
+    outputs = [
+        Output(display_name="Training Data", name="train", method="build_train"),
+        Output(display_name="Validation Data", name="validation", method="build_validation"),
+    ]
+
+    def build_train (self) -> Data:
+        return self.build_split("train")
+
+    def build_validation (self) -> Data:
+        return self.build_split("validation")
+
+    def parse_row_range (self, num_rows: int) -> slice:
+        row_range = self.row_range.replace(" ", "")
+
+        if not row_range:
+            return slice(0, num_rows)
+
+        if not re.match(r'^\d*:\d*$', row_range):
+            raise ValueError("Rows should be a slice as start:stop, e.g. 0:1000.")
+
+        start, stop = row_range.split(":")
+        return slice(int(start) if start else 0, min(int(stop), num_rows) if stop else num_rows)
+
+    def build_split (self, split: str) -> Data:
+        x = open_array(self.x_path, self.x_key)
+        y = open_array(self.y_path, self.y_key) if self.y_path else None
+
+        if y is not None and len(x) != len(y):
+            raise ValueError(f"Input array (x) has {len(x)} rows but target array (y) has {len(y)}.")
+
+        rows = self.parse_row_range(len(x))
+
+        # basic slicing of a memmap is a view, nothing is read yet
+        x = x[rows]
+        y = y[rows] if y is not None else None
+
+        if not 0.0 <= self.validation_split < 1.0:
+            raise ValueError("Validation split should be in [0, 1).")
+
+        num_rows = len(x)
+        num_validation = int(round(num_rows * self.validation_split))
+        num_train = num_rows - num_validation
+        indices = None
+
+        if self.shuffle_split and num_validation:
+            order = np.random.default_rng(self.seed).permutation(num_rows)
+            indices = np.sort(order[:num_train] if split == "train" else order[num_train:])
+        else:
+            part = slice(0, num_train) if split == "train" else slice(num_train, num_rows)
+            x = x[part]
+            y = y[part] if y is not None else None
+
+        fingerprint = file_fingerprint(
+            self.x_path.strip(), self.x_key, self.y_path.strip(), self.y_key,
+            self.row_range, self.validation_split, self.shuffle_split, self.seed, split,
+        )
+
+        return Data(x=x, y=y, indices=indices, fingerprint=fingerprint)
@@ -24,8 +24,32 @@ Author: James Guana
 from langflow.custom import Component
 from langflow.template import Input, Output
 from langflow.schema import Data, DataFrame
-from langflow.io import DataFrameInput, IntInput
+from langflow.io import BoolInput, DataFrameInput, DropdownInput, HandleInput, IntInput, StrInput
+from types import SimpleNamespace
+import os
 import numpy as np
+import pandas as pd
+import time
+from dl_utils import (
+    ARRAY_CACHE,
+    FIT_CACHE,
+    REGISTRY,
+    ChunkedSource,
+    architecture_fingerprint,
+    check_masking,
+    check_samples,
+    file_fingerprint,
+    fingerprint_frame,
+    flow_owner,
+    frame_to_array,
+    frame_to_sequences,
+    history_to_frame,
+    input_dtype,
+    load_checkpoint,
+    resolve_model,
+    sequence_lengths,
+    source_files,
+)
 
 class KerasFit(Component):
     display_name = "Keras Fit"
@@ -37,6 +61,8 @@ class KerasFit(Component):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.history = None
+        self.fit_result = None
+        self.profile = None
 
     inputs = [
         Input(
@@ -50,9 +76,8 @@ class KerasFit(Component):
         DataFrameInput(
             name="x",
             display_name="Input Data (x)",
-            info="Input data for training.",
+            info="Input data for training. Not needed when a dataset or streaming data source is set.",
             field_type="DataFrame",
-            required=True,
         ),
         DataFrameInput(
             name="y",
@@ -60,6 +85,20 @@ class KerasFit(Component):
             info="Target data for training.",
             field_type="DataFrame",
         ),
+        HandleInput(
+            name="dataset",
+            display_name="Dataset",
+            info="Memory-mapped training data from Keras NumPy Dataset, used instead of x and y.",
+            input_types=["Data"],
+            required=False,
+        ),
+        HandleInput(
+            name="validation_dataset",
+            display_name="Validation Dataset",
+            info="Memory-mapped validation data from Keras NumPy Dataset.",
+            input_types=["Data"],
+            required=False,
+        ),
         IntInput(
             name="input_epochs",
             display_name="Epochs",
@@ -72,40 +111,342 @@ class KerasFit(Component):
             info="Number of samples per gradient update.",
             value=None,
         ),
+        StrInput(
+            name="data_source",
+            display_name="Streaming Data Source",
+            info="Parquet/CSV file or directory of shards to stream instead of loading x and y into memory.",
+            value="",
+            advanced=True,
+        ),
+        StrInput(
+            name="x_columns",
+            display_name="Streaming x Columns",
+            info="Comma-separated feature columns of the data source. Defaults to all columns not used as targets.",
+            value="",
+            advanced=True,
+        ),
+        StrInput(
+            name="y_columns",
+            display_name="Streaming y Columns",
+            info="Comma-separated target columns of the data source.",
+            value="",
+            advanced=True,
+        ),
+        IntInput(
+            name="shuffle_buffer",
+            display_name="Shuffle Buffer (chunks)",
+            info="Number of row groups/chunks whose rows are shuffled together. 1 disables shuffling.",
+            value=4,
+            advanced=True,
+        ),
+        IntInput(
+            name="workers",
+            display_name="Prefetch Workers",
+            info="Number of worker threads reading chunks ahead of training.",
+            value=2,
+            advanced=True,
+        ),
+        IntInput(
+            name="max_queue_size",
+            display_name="Prefetch Queue Size",
+            info="Maximum number of batches prepared ahead of training.",
+            value=10,
+            advanced=True,
+        ),
+        StrInput(
+            name="performance_log",
+            display_name="Performance Log",
+            info="Optional JSON-lines file each epoch's performance record is appended to.",
+            value="",
+            advanced=True,
+        ),
+        StrInput(
+            name="checkpoint_dir",
+            display_name="Checkpoint Directory",
+            info="Directory for periodic checkpoints. A run with the same model, data and batch size "
+                 "resumes from its last checkpoint. Leave empty to disable checkpointing.",
+            value="",
+            advanced=True,
+        ),
+        IntInput(
+            name="checkpoint_frequency",
+            display_name="Checkpoint Frequency",
+            info="Save a checkpoint every N epochs or steps.",
+            value=1,
+            advanced=True,
+        ),
+        DropdownInput(
+            name="checkpoint_unit",
+            display_name="Checkpoint Unit",
+            info="Whether the checkpoint frequency counts epochs or steps.",
+            options=["epoch", "step"],
+            value="epoch",
+            advanced=True,
+        ),
+        BoolInput(
+            name="checkpoint_best_only",
+            display_name="Best Checkpoint Only",
+            info="Only save epoch checkpoints that improve the validation loss (or the loss without validation data).",
+            value=False,
+            advanced=True,
+        ),
+        StrInput(
+            name="profile_dir",
+            display_name="Profile Directory",
+            info="Directory the backend profiler trace is written to. Leave empty to disable profiling.",
+            value="",
+            advanced=True,
+        ),
+        StrInput(
+            name="profile_steps",
+            display_name="Profile Steps",
+            info="Window of steps to profile as start:stop, counted from the first training step.",
+            value="5:15",
+            advanced=True,
+        ),
+        IntInput(
+            name="profile_top_ops",
+            display_name="Profile Top Ops",
+            info="Number of most expensive ops in the profile summary.",
+            value=20,
+            advanced=True,
+        ),
+        IntInput(
+            name="averaging_workers",
+            display_name="Model-Averaging Workers",
+            info="Number of local processes that each train a replica on a shard of x and y; "
+                 "their weights are averaged after every epoch. This is model averaging, not data-parallel "
+                 "training: gradients are not shared between steps, so convergence differs from single-process "
+                 "training. 1 trains in this process.",
+            value=1,
+            advanced=True,
+        ),
+        BoolInput(
+            name="cache_arrays",
+            display_name="Cache Converted Arrays",
+            info="Keep converted DataFrames on disk and memory-map them when the same data is used again.",
+            value=True,
+            advanced=True,
+        ),
+        IntInput(
+            name="sequence_buckets",
+            display_name="Sequence Buckets",
+            info="Length buckets for a column of variable-length sequences; each batch is padded only to its bucket's length.",
+            value=4,
+            advanced=True,
+        ),
     ]
 
     outputs = [
         Output(display_name="Model", name="model", method="fit_model"),
-        Output(display_name="History", name="history", method="get_history")
+        Output(display_name="History", name="history", method="get_history"),
+        Output(display_name="Performance", name="performance", method="get_performance"),
+        Output(display_name="Profile", name="profile", method="get_profile"),
     ]
 
     def fit_model(self) -> Data:
+        model, _, _ = self.run_fit()
+        return Data(model=REGISTRY.track(model, flow_owner(self), self.name))
+
+    def get_history (self) -> DataFrame:
+        _, history, _ = self.run_fit()
+
+        if history is None:
+            raise ValueError("Cannot retrieve training history")
+
+        return DataFrame(history)
+
+    def get_performance (self) -> DataFrame:
+        _, _, performance = self.run_fit()
+        return DataFrame(performance)
+
+    def get_profile (self) -> Data:
+        self.run_fit()
+
+        if self.profile is None:
+            raise ValueError("Set a profile directory to profile training.")
+
+        return Data(**self.profile)
+
+    # both outputs are served from one training run, shared across flow runs via FIT_CACHE
+    def run_fit (self):
+        if self.fit_result is not None:
+            return self.fit_result
+
         model = None
 
         if isinstance(self.input_model, Data):
-            model = self.input_model.model
+            model = resolve_model(self.input_model.model)
         else:
             raise ValueError("Cannot read input model")
-        
-        x = self.x.squeeze(axis=1).values.astype(np.float32)
-        y = self.y.squeeze(axis=1).values.astype(np.float32)
-        
+
         batch_size = self.batch_size if self.batch_size is not None else 32
 
-        self.history = model.fit(
-            x=x,
-            y=y,
-            batch_size=batch_size,
-            epochs=self.input_epochs
+        if self.data_source:
+            # size and mtime only; the source is indexed once training actually runs
+            data_key = (file_fingerprint(*source_files(self.data_source)), self.x_columns, self.y_columns, self.shuffle_buffer)
+        elif self.dataset is not None:
+            validation = self.validation_dataset
+            data_key = (self.dataset.fingerprint, validation.fingerprint if validation is not None else None)
+        elif self.x is not None:
+            data_key = (fingerprint_frame(self.x), fingerprint_frame(self.y), self.sequence_buckets)
+        else:
+            raise ValueError("Either input data (x), a dataset or a streaming data source is required.")
+
+        key = (
+            id(model),
+            data_key,
+            self.input_epochs,
+            batch_size,
+            self.averaging_workers,
         )
-        
-        return Data(model=model)
-    
-    def get_history (self) -> Data:
 
-        self.fit_model()
+        # a profiled run has to train, so it bypasses cached results
+        cached = FIT_CACHE.get(key) if not self.profile_dir else None
+        if cached is not None:
+            self.fit_result = cached
+            return cached
 
-        if self.history is None:
-            raise ValueError("Cannot retrieve training history")
+        # inputs are converted straight to the compute dtype of a mixed precision model
+        x_dtype = input_dtype(model)
+        conversion_seconds = 0.0
+
+        if self.data_source:
+            from keras_streaming import StreamingDataset
+
+            source = ChunkedSource.open(self.data_source)
+            x_columns, y_columns = self.streaming_columns(source)
+            fit_data = dict(
+                x=StreamingDataset(
+                    source,
+                    x_columns,
+                    y_columns,
+                    batch_size=batch_size,
+                    shuffle_chunks=self.shuffle_buffer,
+                    workers=max(1, self.workers),
+                    max_queue_size=self.max_queue_size,
+                    dtype=x_dtype,
+                )
+            )
+        elif self.dataset is not None:
+            from keras_streaming import ArrayDataset
+
+            dataset = self.dataset
+            fit_data = dict(
+                x=ArrayDataset(dataset.x, dataset.y, dataset.indices, batch_size=batch_size, shuffle=True, dtype=x_dtype)
+            )
+            if self.validation_dataset is not None:
+                validation = self.validation_dataset
+                fit_data["validation_data"] = ArrayDataset(
+                    validation.x, validation.y, validation.indices, batch_size=batch_size, dtype=x_dtype
+                )
+        else:
+            start = time.perf_counter()
+            convert = ARRAY_CACHE.convert if self.cache_arrays else frame_to_array
+            y = convert(self.y, name="y")
+            if sequence_lengths(self.x) is not None:
+                from keras_streaming import BucketedSequenceDataset
+
+                check_masking(model)
+                sequences = frame_to_sequences(self.x, dtype=x_dtype, name="x")
+                check_samples(sequences, y)
+                fit_data = dict(
+                    x=BucketedSequenceDataset(
+                        sequences, y, batch_size=batch_size, num_buckets=self.sequence_buckets, shuffle=True, dtype=x_dtype
+                    )
+                )
+            else:
+                x = convert(self.x, dtype=x_dtype, name="x")
+                check_samples(x, y)
+                fit_data = dict(x=x, y=y, batch_size=batch_size)
+            conversion_seconds = time.perf_counter() - start
+
+        if self.averaging_workers > 1:
+            if "y" not in fit_data:
+                raise ValueError("Model-averaging training needs in-memory input data (x) and (y).")
+            if self.profile_dir or self.checkpoint_dir:
+                raise ValueError("Profiling and checkpointing are not available for model-averaging training.")
+
+            from dl_parallel import fit_model_averaging
+
+            self.history, report = fit_model_averaging(
+                model, fit_data["x"], fit_data["y"], batch_size, self.input_epochs, self.averaging_workers
+            )
+            self.status = report
+            performance = pd.DataFrame([dict(report, conversion_seconds=conversion_seconds)])
+        else:
+            from keras_callbacks import CheckpointCallback, PerformanceCallback, ProfilerCallback
+
+            data = fit_data["x"]
+            num_samples = len(data) if isinstance(data, np.ndarray) else getattr(data, "num_rows", None)
+            callback = PerformanceCallback(batch_size, num_samples, conversion_seconds, self.performance_log)
+            callbacks = [callback]
+
+            profiler = None
+            if self.profile_dir:
+                profiler = ProfilerCallback(self.profile_dir, self.profile_steps, self.profile_top_ops)
+                callbacks.append(profiler)
+
+            initial_epoch = 0
+            if self.checkpoint_dir:
+                directory = self.checkpoint_directory(model, data_key, batch_size)
+                meta = load_checkpoint(directory, model) or {}
+                initial_epoch = meta.get("epoch", 0)
+                callbacks.append(
+                    CheckpointCallback(
+                        directory,
+                        frequency=self.checkpoint_frequency,
+                        unit=self.checkpoint_unit,
+                        best_only=self.checkpoint_best_only,
+                        monitor="val_loss" if "validation_data" in fit_data else "loss",
+                        best=meta.get("best"),
+                    )
+                )
+                if meta:
+                    self.status = f"Resumed from checkpoint at epoch {initial_epoch} in {directory}"
+
+            try:
+                if initial_epoch >= self.input_epochs:
+                    # the checkpoint already covers every requested epoch
+                    self.history = SimpleNamespace(history={}, epoch=[])
+                else:
+                    self.history = model.fit(
+                        epochs=self.input_epochs,
+                        initial_epoch=initial_epoch,
+                        callbacks=callbacks,
+                        **fit_data
+                    )
+            finally:
+                if profiler is not None:
+                    profiler.finish()
+                    self.profile = profiler.summary()
+
+            performance = pd.DataFrame(callback.records)
+
+        self.fit_result = (model, history_to_frame(self.history), performance)
+        FIT_CACHE.put(key, self.fit_result)
+
+        return self.fit_result
+
+    def checkpoint_directory (self, model, data_key, batch_size: int) -> str:
+        import keras
+
+        run = architecture_fingerprint(
+            keras.backend.backend(),
+            model.get_config(),
+            dict(compile=model.get_compile_config(), data=data_key, batch_size=batch_size),
+        )
+        return os.path.join(os.path.expanduser(self.checkpoint_dir.strip()), run)
+
+    def streaming_columns (self, source: ChunkedSource):
+        y_columns = [c.strip() for c in self.y_columns.split(",") if c.strip()]
+        x_columns = [c.strip() for c in self.x_columns.split(",") if c.strip()]
+
+        if not x_columns:
+            x_columns = [c for c in source.columns if c not in y_columns]
+
+        missing = [c for c in x_columns + y_columns if c not in source.columns]
+        if missing:
+            raise ValueError(f"Columns {missing} not found in data source, available: {source.columns}")
 
-        return Data (history=self.history)
\ No newline at end of file
+        return x_columns, y_columns
@@ -25,11 +25,14 @@ from langflow.custom import Component
 from langflow.template import Input, Output
 from langflow.schema import Data
 from langflow.io import IntInput, DropdownInput, StrInput
+import math
 import re
+import warnings
+from dl_utils import LayerSpec, ModelSpec, active_backend, select_backend
 
 class KerasConv (Component):
     display_name = "Keras Conv Layer"
-    description = "Convolutional layer with customizable filters, kernel size, and activation."
+    description = "Convolutional layer with customizable filters, kernel size, strides, variant, and pooling."
     documentation = "https://keras.io/api/layers/convolution_layers/"
     icon = "layers"
     name = "KerasConv"
@@ -51,10 +54,18 @@ class KerasConv (Component):
             value="Conv1D",
             required=True,
         ),
+        DropdownInput(
+            name="variant",
+            display_name="Variant",
+            info="Separable convolutions factor the kernel into a per-channel (depthwise) and a 1x1 (pointwise) "
+                 "convolution; depthwise convolutions only filter each channel. Conv1D and Conv2D only.",
+            options=["standard", "separable", "depthwise"],
+            value="standard",
+        ),
         IntInput(
             name="filters",
             display_name="Filters",
-            info="Number of filters in the Conv layer.",
+            info="Number of filters in the Conv layer. Not used by depthwise convolutions.",
             value=1,
             required=True,
         ),
@@ -64,6 +75,41 @@ class KerasConv (Component):
             info="Size of the kernel as a comma-separated list, e.g., 3, 3.",
             value="1",
         ),
+        StrInput(
+            name="strides",
+            display_name="Strides",
+            info="Strides as a comma-separated list, or one value for every dimension.",
+            value="1",
+        ),
+        StrInput(
+            name="dilation_rate",
+            display_name="Dilation Rate",
+            info="Dilation rate as a comma-separated list, or one value for every dimension. Cannot be combined with strides.",
+            value="1",
+            advanced=True,
+        ),
+        DropdownInput(
+            name="padding",
+            display_name="Padding",
+            info="valid shrinks the output by the kernel size, same keeps it; causal is for standard Conv1D only.",
+            options=["valid", "same", "causal"],
+            value="valid",
+        ),
+        DropdownInput(
+            name="data_format",
+            display_name="Data Format",
+            info="Position of the channel dimension in the data.",
+            options=["channels_last", "channels_first"],
+            value="channels_last",
+            advanced=True,
+        ),
+        IntInput(
+            name="depth_multiplier",
+            display_name="Depth Multiplier",
+            info="Output channels per input channel of the depthwise step of separable and depthwise convolutions.",
+            value=1,
+            advanced=True,
+        ),
         DropdownInput(
             name="input_activation",
             display_name="Activation",
@@ -71,6 +117,19 @@ class KerasConv (Component):
             options=["None", "relu", "sigmoid", "tanh", "softmax"],
             value="None",
         ),
+        DropdownInput(
+            name="pooling",
+            display_name="Pooling",
+            info="Pooling layer added after the convolution.",
+            options=["None", "max", "average"],
+            value="None",
+        ),
+        StrInput(
+            name="pool_size",
+            display_name="Pool Size",
+            info="Pool size as a comma-separated list, or one value for every dimension.",
+            value="2",
+        ),
     ]
 
     outputs = [
@@ -81,11 +140,25 @@ class KerasConv (Component):
         pattern = re.compile(r'^(\d+\s*,\s*)*\d+$')
         return bool(pattern.match(input_shape.strip()))
 
+    def parse_sizes(self, value: str, rank: int, label: str) -> tuple:
+        value = value.replace(" ", "")
+
+        if not self.validate_input_shape(value):
+            raise ValueError(f"{label} should contain only numbers and commas.")
+
+        sizes = tuple(map(int, value.split(',')))
+
+        if len(sizes) == 1:
+            return sizes * rank
+        if len(sizes) != rank:
+            raise ValueError(f"{self.input_conv_type} requires 1 or {rank} values for {label.lower()}.")
+        return sizes
+
     def add_layer(self) -> Data:
         model = None
         activation = None
 
-        if isinstance(self.input_model, Data):
+        if isinstance(self.input_model, Data) and isinstance(self.input_model.model, ModelSpec):
             model = self.input_model.model
         else:
             raise ValueError("Cannot read input model")
@@ -105,36 +178,99 @@ class KerasConv (Component):
             warnings.warn(f"{self.input_conv_type} only requires {required_length} values for kernel size. Using the first {required_length} values.")
             kernel_size = kernel_size[:required_length]
 
+        strides = self.parse_sizes(self.strides, required_length, "Strides")
+        dilation_rate = self.parse_sizes(self.dilation_rate, required_length, "Dilation rate")
+        strided, dilated = max(strides) > 1, max(dilation_rate) > 1
+
+        if strided and dilated:
+            raise ValueError("Strides and dilation rate greater than 1 cannot be combined.")
+
+        if self.variant != "standard" and self.input_conv_type == "Conv3D":
+            raise ValueError(f"Keras has no {self.variant} Conv3D layer.")
+
+        if self.padding == "causal" and (self.input_conv_type != "Conv1D" or self.variant != "standard"):
+            raise ValueError("Causal padding is only available for standard Conv1D layers.")
+
         if self.input_activation != "None":
             activation = self.input_activation
 
         filters = int(self.filters)
 
+        if self.input_conv_type == "Conv1D":
+            kernel_size = kernel_size[0]  # Use the first value
+            strides = strides[0]
+            dilation_rate = dilation_rate[0]
+
+        config = dict(
+            kernel_size=kernel_size,
+            padding=self.padding,
+            data_format=self.data_format,
+            activation=activation,
+        )
+
+        # the unchanged choices first, so the report can attribute the FLOP reduction to each option
+        block = [("stride-1 standard", [LayerSpec.of(self.input_conv_type, filters=filters, **config)])]
+
+        if strided or dilated:
+            block.append(("strides" if strided else "dilation", [LayerSpec.of(self.input_conv_type, filters=filters, strides=strides, dilation_rate=dilation_rate, **config)]))
+
+        if self.variant != "standard":
+            layer_type = self.input_conv_type.replace("Conv", "SeparableConv" if self.variant == "separable" else "DepthwiseConv")
+            options = dict(filters=filters) if self.variant == "separable" else {}
+            block.append((self.variant, [
+                LayerSpec.of(layer_type, depth_multiplier=self.depth_multiplier, strides=strides, dilation_rate=dilation_rate, **options, **config)
+            ]))
+
+        if self.pooling != "None":
+            pool_type = {"max": "MaxPooling", "average": "AveragePooling"}[self.pooling] + self.input_conv_type[-2:]
+            pool_size = self.parse_sizes(self.pool_size, required_length, "Pool size")
+            block.append(("pooling", block[-1][1] + [
+                LayerSpec.of(pool_type, pool_size=pool_size[0] if required_length == 1 else pool_size, data_format=self.data_format)
+            ]))
+
+        for layer in block[-1][1]:
+            model = model.add(layer)
+
+        if any(layer.class_name == "Input" for layer in model.layers):
+            self.status = self.flops_report(model, block)
+
+        return Data(model=model)
+
+    def flops_report(self, model, block) -> str:
+        """FLOPs per sample and output size of the block after each option, relative to a
+        stride-1 standard convolution on the same input."""
+
+        from dl_cost import spec_costs
+
+        # shapes and FLOPs do not depend on the backend; switching to the model's backend
+        # would purge keras and the caches, so whichever backend is loaded is used
+        if active_backend() is None:
+            select_backend(model.backend)
+
         import keras
 
-        if self.input_conv_type == "Conv1D":
-            model.add(
-                keras.layers.Conv1D(
-                    filters=filters,
-                    kernel_size=kernel_size[0],  # Use the first value
-                    activation=activation
-                )
-            )
-        elif self.input_conv_type == "Conv2D":
-            model.add(
-                keras.layers.Conv2D(
-                    filters=filters,
-                    kernel_size=kernel_size,  # Use the first two values
-                    activation=activation
-                )
-            )
-        elif self.input_conv_type == "Conv3D":
-            model.add(
-                keras.layers.Conv3D(
-                    filters=filters,
-                    kernel_size=kernel_size,  # Use the first three values
-                    activation=activation
-                )
-            )
+        previous = list(model.layers[:len(model.layers) - len(block[-1][1])])
 
-        return Data(model=model)
\ No newline at end of file
+        lines = []
+        base_flops, base_outputs = None, None
+        for index, (label, layers) in enumerate(block):
+            costs = spec_costs(keras, previous + layers)[-len(layers):]
+            shape = costs[-1][1]
+            prefix = f"+ {label}:" if index else f"{label}:"
+
+            if None in shape or any(cost[2] is None for cost in costs):
+                # FLOPs scale with the variable dimension, only the output shape is known
+                lines.append(f"{prefix} output {shape}, FLOPs depend on the variable dimensions")
+                continue
+
+            flops = sum(cost[2] for cost in costs)
+            outputs = math.prod(shape)
+            if base_flops is None:
+                base_flops, base_outputs = flops, outputs
+                lines.append(f"{prefix} {flops / 1e6:.3f} MFLOPs/sample, output {shape}")
+            else:
+                lines.append(
+                    f"{prefix} {flops / 1e6:.3f} MFLOPs/sample ({flops / base_flops - 1:+.0%}), "
+                    f"output {shape} ({outputs / base_outputs - 1:+.0%} activations)"
+                )
+        return "\n".join(lines)
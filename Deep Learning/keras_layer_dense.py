@@ -33,6 +33,7 @@ from langflow.io import (
     StrInput,
 )
 import re
+from dl_utils import LayerSpec, ModelSpec
 
 class KerasDense (Component):
     display_name = "Keras Dense"
@@ -72,7 +73,7 @@ class KerasDense (Component):
 
     def add_layer (self) -> Data:
 
-        if isinstance (self.input_model, Data):
+        if isinstance (self.input_model, Data) and isinstance (self.input_model.model, ModelSpec):
             model = self.input_model.model
         else:
             raise ValueError("Sequential model not initialized.")
@@ -82,11 +83,10 @@ class KerasDense (Component):
         if self.input_activation != "None":
             activation = self.input_activation
 
-        import keras
-
-        model.add (
-            keras.layers.Dense (
-                units = self.input_units, 
+        model = model.add (
+            LayerSpec.of (
+                "Dense",
+                units = self.input_units,
                 activation = activation
             )
         )
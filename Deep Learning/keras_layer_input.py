@@ -33,6 +33,7 @@ from langflow.io import (
     StrInput,
 )
 import re
+from dl_utils import LayerSpec, ModelSpec
 
 class KerasInput (Component):
     display_name = "Keras Input"
@@ -53,7 +54,7 @@ class KerasInput (Component):
         Input(
             name="input_shape",
             display_name="Data Shape",
-            info="Input shape as a comma-separated list, e.g., 28, 28, 1 or 1.",
+            info="Input shape as a comma-separated list, e.g., 28, 28, 1 or 1. Use None for a variable length, e.g., None, 3 for sequences.",
             required=True,
             value="1",
         ),
@@ -65,13 +66,13 @@ class KerasInput (Component):
 
     def validate_input_shape (self, input_shape: str) -> bool:
  
-        pattern = re.compile(r'^(\d+\s*,\s*)*\d+$')
+        pattern = re.compile(r'^((\d+|None)\s*,\s*)*(\d+|None)$')
         return bool(pattern.match(input_shape.strip()))
 
     def add_input_layer(self) -> Data:
 
 
-        if isinstance(self.input_model, Data):
+        if isinstance(self.input_model, Data) and isinstance(self.input_model.model, ModelSpec):
             model = self.input_model.model
         else:
             raise ValueError("Sequential model not initialized.")
@@ -81,12 +82,11 @@ class KerasInput (Component):
         if not self.validate_input_shape(input_shape_str):
             raise ValueError("Invalid input shape. Only numbers and commas are allowed.")
 
-        input_shape = tuple(map(int, input_shape_str.split(',')))
+        input_shape = tuple(None if dim == "None" else int(dim) for dim in input_shape_str.split(','))
 
-        import keras
-
-        model.add(
-            keras.Input(
+        model = model.add(
+            LayerSpec.of(
+                "Input",
                 shape=input_shape
             )
         )
@@ -26,6 +26,7 @@ from langflow.template import Input, Output
 from langflow.schema import Data
 from langflow.io import IntInput, DropdownInput, BoolInput
 import warnings
+from dl_utils import LayerSpec, ModelSpec
 
 class KerasRecurrent(Component):
     display_name = "Keras Recurrent"
@@ -84,6 +85,23 @@ class KerasRecurrent(Component):
             info="Whether to enable or disable the use of CUDNN for LSTM.",
             value=False,
         ),
+        BoolInput(
+            name="masking",
+            display_name="Masking",
+            info="Skip padded (all-zero) steps of variable-length sequences. Adds a Masking layer in front "
+                 "of the first recurrent layer; use an Input shape of None, features. Required to fit or predict "
+                 "ragged (list-valued) columns. Real all-zero steps "
+                 "are skipped as well.",
+            value=False,
+        ),
+        BoolInput(
+            name="unroll",
+            display_name="Unroll",
+            info="Unroll the recurrence into straight-line ops. Faster for short sequences, "
+                 "at the cost of memory; needs a fixed sequence length.",
+            value=False,
+            advanced=True,
+        ),
     ]
 
     outputs = [
@@ -93,7 +111,7 @@ class KerasRecurrent(Component):
     def add_layer(self) -> Data:
         model = None
 
-        if isinstance(self.input_model, Data):
+        if isinstance(self.input_model, Data) and isinstance(self.input_model.model, ModelSpec):
             model = self.input_model.model
         else:
             raise ValueError("Cannot read input model")
@@ -103,28 +121,25 @@ class KerasRecurrent(Component):
         recurrent_activation = self.recurrent_activation
         return_sequences = self.return_sequences
         use_cudnn=self.input_use_cudnn
-        
-        import keras
 
-        if self.input_recurrent_type == "GRU":
-            model.add(
-                keras.layers.GRU(
-                    units=units,
-                    activation=activation,
-                    recurrent_activation=recurrent_activation,
-                    return_sequences=return_sequences,
-                    use_cudnn=use_cudnn
-                )
-            )
-        elif self.input_recurrent_type == "LSTM":
-            model.add(
-                keras.layers.LSTM(
-                    units=units,
-                    activation=activation,
-                    recurrent_activation=recurrent_activation,
-                    return_sequences=return_sequences,
-                    use_cudnn=use_cudnn
-                )
+        names = [layer.class_name for layer in model.layers]
+        if self.unroll and "Input" in names and dict(model.layers[names.index("Input")].config)["shape"][0] is None:
+            raise ValueError("Unroll needs a fixed sequence length in the Input layer.")
+
+        # the mask propagates through stacked recurrent layers, so one Masking layer is enough
+        if self.masking and "Masking" not in names:
+            model = model.add(LayerSpec.of("Masking", mask_value=0.0))
+
+        model = model.add(
+            LayerSpec.of(
+                self.input_recurrent_type,
+                units=units,
+                activation=activation,
+                recurrent_activation=recurrent_activation,
+                return_sequences=return_sequences,
+                use_cudnn=use_cudnn,
+                unroll=self.unroll,
             )
+        )
 
         return Data(model=model)
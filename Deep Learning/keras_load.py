@@ -0,0 +1,88 @@
+"""
+Copyright (c) 2025 Authors
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is furnished
+to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED,
+INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A
+PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+Author: James Guana
+"""
+
+from langflow.custom import Component
+from langflow.template import Output
+from langflow.schema import Data
+from langflow.io import BoolInput, StrInput
+import json
+import os
+import time
+from dl_utils import REGISTRY, flow_owner, open_weights, select_backend
+
+class KerasLoad (Component):
+    display_name = "Keras Load"
+    description = "Loads a model saved by Keras Save, with memory-mapped weights."
+    documentation = "https://keras.io/api/models/model_saving_apis/"
+    icon = "upload"
+    name = "KerasLoad"
+
+    inputs = [
+        StrInput(
+            name="path",
+            display_name="Path",
+            info="A .manifest.json written by Keras Save (fast, memory-mapped weights) or a .keras archive.",
+            required=True,
+        ),
+        BoolInput(
+            name="compile",
+            display_name="Compile",
+            info="Restore the training configuration. Not needed for prediction.",
+            value=False,
+        ),
+    ]
+
+    outputs = [
+        Output(display_name="Model", name="model", method="load_model"),
+    ]
+
+    def load_model (self) -> Data:
+        path = os.path.expanduser(self.path.strip())
+
+        if not os.path.isfile(path):
+            raise ValueError(f"Saved model not found: {path}")
+
+        start = time.perf_counter()
+
+        if path.endswith(".keras"):
+            import keras
+
+            model = keras.models.load_model(path, compile=self.compile)
+        else:
+            with open(path) as f:
+                manifest = json.load(f)
+
+            # the model is rebuilt on the backend it was saved from
+            select_backend(manifest["backend"])
+
+            import keras
+
+            model = keras.models.model_from_json(json.dumps(manifest["config"]))
+            model.set_weights(open_weights(os.path.join(os.path.dirname(path), "weights"), manifest["weights"]))
+
+            if self.compile and manifest["compile_config"] is not None:
+                model.compile_from_config(manifest["compile_config"])
+
+        self.status = f"Loaded in {time.perf_counter() - start:.3f}s"
+
+        return Data(model=REGISTRY.track(model, flow_owner(self), self.name))
@@ -24,9 +24,22 @@ Author: James Guana
 from langflow.custom import Component
 from langflow.template import Input, Output
 from langflow.schema import Data, DataFrame
-from langflow.io import DataFrameInput, IntInput
+from langflow.io import BoolInput, DataFrameInput, HandleInput, IntInput, StrInput
 import numpy as np
+import pandas as pd
 from langflow.schema import DataFrame
+from dl_utils import (
+    ARRAY_CACHE,
+    PredictionWriter,
+    check_masking,
+    frame_to_array,
+    frame_to_sequences,
+    input_dtype,
+    iter_chunks,
+    prediction_columns,
+    resolve_model,
+    sequence_lengths,
+)
 
 class KerasPredict(Component):
     display_name = "Keras Predict"
@@ -35,6 +48,11 @@ class KerasPredict(Component):
     icon = "train"
     name = "KerasPredict"
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.prediction_result = None
+        self.profile = None
+
     inputs = [
         Input(
             name="input_model",
@@ -50,27 +68,170 @@ class KerasPredict(Component):
             info="Target data for training.",
             field_type="DataFrame",
         ),
+        HandleInput(
+            name="dataset",
+            display_name="Dataset",
+            info="Memory-mapped data from Keras NumPy Dataset, used instead of x.",
+            input_types=["Data"],
+            required=False,
+        ),
+        IntInput(
+            name="batch_size",
+            display_name="Batch Size",
+            info="Number of samples per prediction batch.",
+            value=32,
+        ),
+        IntInput(
+            name="chunk_size",
+            display_name="Chunk Size",
+            info="Number of samples predicted per call; results are collected chunk by chunk.",
+            value=16384,
+            advanced=True,
+        ),
+        BoolInput(
+            name="cache_arrays",
+            display_name="Cache Converted Arrays",
+            info="Keep converted DataFrames on disk and memory-map them when the same data is used again.",
+            value=True,
+            advanced=True,
+        ),
+        IntInput(
+            name="sequence_buckets",
+            display_name="Sequence Buckets",
+            info="Length buckets for a column of variable-length sequences; each batch is padded only to its bucket's length.",
+            value=4,
+            advanced=True,
+        ),
+        StrInput(
+            name="output_path",
+            display_name="Prediction File",
+            info="Optional .npy or .parquet file the predictions are written to as they are produced.",
+            value="",
+            advanced=True,
+        ),
+        StrInput(
+            name="profile_dir",
+            display_name="Profile Directory",
+            info="Directory the backend profiler trace is written to. Leave empty to disable profiling.",
+            value="",
+            advanced=True,
+        ),
+        StrInput(
+            name="profile_steps",
+            display_name="Profile Steps",
+            info="Window of steps to profile as start:stop, counted from the first prediction step.",
+            value="5:15",
+            advanced=True,
+        ),
+        IntInput(
+            name="profile_top_ops",
+            display_name="Profile Top Ops",
+            info="Number of most expensive ops in the profile summary.",
+            value=20,
+            advanced=True,
+        ),
+        BoolInput(
+            name="return_predictions",
+            display_name="Return Predictions",
+            info="Return the predictions as a DataFrame. Disable to only write the prediction file.",
+            value=True,
+            advanced=True,
+        ),
     ]
 
     outputs = [
-        Output(display_name="Predictions", name="predict", method="predict")
+        Output(display_name="Predictions", name="predict", method="predict"),
+        Output(display_name="Profile", name="profile", method="get_profile"),
     ]
 
     def predict (self) -> DataFrame:
+        if self.prediction_result is None:
+            self.prediction_result = self.run_predict()
+        return self.prediction_result
+
+    def get_profile (self) -> Data:
+        self.predict()
+
+        if self.profile is None:
+            raise ValueError("Set a profile directory to profile prediction.")
+
+        return Data(**self.profile)
+
+    def run_predict (self) -> DataFrame:
         model = None
 
         if isinstance(self.input_model, Data):
-            model = self.input_model.model
+            model = resolve_model(self.input_model.model)
         else:
             raise ValueError("Cannot read input model")
 
-        x = self.x.squeeze(axis=1).values.astype(np.float32)
+        batch_size = self.batch_size if self.batch_size else 32
+        chunk_size = max(self.chunk_size or 0, batch_size)
+
+        if self.dataset is not None:
+            from keras_streaming import ArrayDataset
+
+            x = ArrayDataset(self.dataset.x, indices=self.dataset.indices, batch_size=batch_size, dtype=input_dtype(model))
+        elif sequence_lengths(self.x) is not None:
+            check_masking(model)
+            x = frame_to_sequences(self.x, dtype=input_dtype(model), name="x")
+        elif self.x is not None:
+            convert = ARRAY_CACHE.convert if self.cache_arrays else frame_to_array
+            x = convert(self.x, dtype=input_dtype(model), name="x")
+        else:
+            raise ValueError("Either input data (x) or a dataset is required.")
+
+        if not self.return_predictions and not self.output_path:
+            raise ValueError("Set a prediction file when predictions are not returned.")
+
+        num_rows = len(x) if isinstance(x, (np.ndarray, list)) else x.num_rows
+        writer = PredictionWriter(self.output_path, num_rows) if self.output_path else None
+        table, columns, row = None, None, 0
+
+        profiler = None
+        if self.profile_dir:
+            from keras_callbacks import ProfilerCallback
+            profiler = ProfilerCallback(self.profile_dir, self.profile_steps, self.profile_top_ops)
+
+        try:
+            for predictions in self.iter_predictions(model, x, batch_size, chunk_size, profiler):
+                if writer is not None:
+                    writer.write(predictions)
+                if self.return_predictions:
+                    chunk, columns = prediction_columns(predictions)
+                    if table is None:
+                        table = np.empty((num_rows, chunk.shape[1]), dtype=np.float32)
+                    table[row:row + len(chunk)] = chunk
+                row += len(predictions)
+        finally:
+            if writer is not None:
+                writer.close()
+            if profiler is not None:
+                profiler.finish()
+                self.profile = profiler.summary()
+
+        if not self.return_predictions:
+            return DataFrame({"path": [writer.path], "rows": [row]})
+
+        # langflow's DataFrame only accepts lists, dicts and pandas frames, not arrays
+        return DataFrame(pd.DataFrame(table, columns=columns, copy=False))
+
+    def iter_predictions (self, model, x, batch_size: int, chunk_size: int, profiler=None):
+        callbacks = [profiler] if profiler is not None else None
+
+        if isinstance(x, list):
+            from keras_streaming import BucketedSequenceDataset
 
-        results = model.predict(
-            x=x
-        )
+            # sequences are bucketed within each chunk, and the predictions put back in row order
+            for start in range(0, len(x), chunk_size):
+                dataset = BucketedSequenceDataset(
+                    x[start:start + chunk_size], batch_size=batch_size, num_buckets=self.sequence_buckets, dtype=x[start].dtype
+                )
+                predictions = np.asarray(model.predict(dataset, verbose=0, callbacks=callbacks))
+                ordered = np.empty_like(predictions)
+                ordered[dataset.order] = predictions
+                yield ordered
+            return
 
-        data_dict = {"y_pred": results.tolist()}
-        data = DataFrame(data_dict)
-        
-        return data
\ No newline at end of file
+        for chunk in iter_chunks(x, chunk_size):
+            yield np.asarray(model.predict(chunk, batch_size=batch_size, verbose=0, callbacks=callbacks))
@@ -0,0 +1,172 @@
+"""
+Copyright (c) 2025 Authors
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is furnished
+to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED,
+INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A
+PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+Author: James Guana
+"""
+
+from langflow.custom import Component
+from langflow.template import Input, Output
+from langflow.schema import Data
+from langflow.io import DataFrameInput, DropdownInput, IntInput
+import time
+import warnings
+import numpy as np
+from dl_utils import REGISTRY, check_samples, flow_owner, frame_to_array, input_dtype, model_nbytes, resolve_model
+
+class KerasQuantize(Component):
+    display_name = "Keras Quantize"
+    description = "Post-training quantization of a trained model for smaller, faster CPU inference."
+    documentation = "https://keras.io/api/models/model/#quantize-method"
+    icon = "train"
+    name = "KerasQuantize"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.quantize_result = None
+
+    inputs = [
+        Input(
+            name="input_model",
+            display_name="Model",
+            field_type="Data",
+            required=True,
+            info="Trained model to be quantized. The input model is left unchanged.",
+            input_types=["Sequential"],
+        ),
+        DropdownInput(
+            name="mode",
+            display_name="Mode",
+            info="int8 quantizes weights per channel and activations per batch at run time; int4 packs weights only.",
+            options=["int8", "int4"],
+            value="int8",
+        ),
+        DataFrameInput(
+            name="x",
+            display_name="Held-out Data (x)",
+            info="Held-out data the quantized predictions are compared on.",
+            field_type="DataFrame",
+            required=True,
+        ),
+        DataFrameInput(
+            name="y",
+            display_name="Held-out Labels (y)",
+            info="Optional labels to evaluate the loss and metrics of both models.",
+            field_type="DataFrame",
+            required=False,
+        ),
+        IntInput(
+            name="batch_size",
+            display_name="Batch Size",
+            info="Batch size the latency of both models is measured at.",
+            value=32,
+        ),
+        IntInput(
+            name="repeats",
+            display_name="Repeats",
+            info="Number of timed prediction calls per model.",
+            value=20,
+            advanced=True,
+        ),
+    ]
+
+    outputs = [
+        Output(display_name="Quantized Model", name="quantized_model", method="quantized_model"),
+        Output(display_name="Quantization Report", name="report", method="get_report"),
+    ]
+
+    def quantized_model (self) -> Data:
+        if self.quantize_result is None:
+            self.quantize_result = self.run_quantize()
+        return Data(model=REGISTRY.track(self.quantize_result[0], flow_owner(self), self.name))
+
+    def get_report (self) -> Data:
+        self.quantized_model()
+        return Data(**self.quantize_result[1])
+
+    def run_quantize (self):
+        import keras
+
+        if isinstance(self.input_model, Data):
+            model = resolve_model(self.input_model.model)
+        else:
+            raise ValueError("Cannot read input model")
+
+        x = frame_to_array(self.x, dtype=input_dtype(model), name="x")
+        y = frame_to_array(self.y, name="y") if self.y is not None else None
+        if y is not None:
+            check_samples(x, y)
+
+        quantized = keras.models.clone_model(model)
+        quantized.set_weights(model.get_weights())
+
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            quantized.quantize(self.mode)
+
+        if model.compiled:
+            quantized.compile_from_config(model.get_compile_config())
+
+        quantized_layers = [layer.name for layer in quantized.layers if getattr(layer, "quantization_mode", None)]
+        if not quantized_layers:
+            raise ValueError(f"No layer of this model supports {self.mode} quantization.")
+
+        batch_size = self.batch_size if self.batch_size else 32
+        expected = np.asarray(model.predict(x, batch_size=batch_size, verbose=0))
+        predicted = np.asarray(quantized.predict(x, batch_size=batch_size, verbose=0))
+        error = np.abs(predicted.astype(np.float64) - expected)
+
+        report = dict(
+            mode=self.mode,
+            quantized_layers=quantized_layers,
+            skipped_layers=[layer.name for layer in quantized.layers if layer.weights and layer.name not in quantized_layers],
+            max_abs_error=float(error.max()),
+            mean_abs_error=float(error.mean()),
+        )
+
+        if expected.ndim == 2 and expected.shape[1] > 1:
+            report["top1_agreement"] = float(np.mean(expected.argmax(axis=1) == predicted.argmax(axis=1)))
+
+        if y is not None and model.compiled:
+            report["metrics"] = model.evaluate(x, y, batch_size=batch_size, verbose=0, return_dict=True)
+            report["quantized_metrics"] = quantized.evaluate(x, y, batch_size=batch_size, verbose=0, return_dict=True)
+
+        size, quantized_size = model_nbytes(model), model_nbytes(quantized)
+        latency, quantized_latency = self.latency(model, x[:batch_size]), self.latency(quantized, x[:batch_size])
+
+        report.update(
+            size_bytes=size,
+            quantized_size_bytes=quantized_size,
+            size_reduction=size / quantized_size,
+            latency_ms=latency * 1000.0,
+            quantized_latency_ms=quantized_latency * 1000.0,
+            speedup=latency / quantized_latency,
+        )
+
+        return quantized, report
+
+    def latency (self, model, batch: np.ndarray) -> float:
+        # first call traces; the median of the rest is the steady-state latency
+        model.predict_on_batch(batch)
+        timings = []
+        for _ in range(max(1, self.repeats)):
+            start = time.perf_counter()
+            np.asarray(model.predict_on_batch(batch))
+            timings.append(time.perf_counter() - start)
+        return float(np.median(timings))
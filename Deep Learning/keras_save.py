@@ -0,0 +1,156 @@
+"""
+Copyright (c) 2025 Authors
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is furnished
+to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED,
+INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A
+PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+Author: James Guana
+"""
+
+from langflow.custom import Component
+from langflow.template import Input, Output
+from langflow.schema import Data
+from langflow.io import BoolInput, DropdownInput, StrInput
+import json
+import os
+import time
+from dl_utils import resolve_model, store_weights
+
+class KerasSave (Component):
+    display_name = "Keras Save"
+    description = "Saves the Keras model as a .keras archive, deduplicated weights and an inference export."
+    documentation = "https://keras.io/api/models/model_saving_apis/"
+    icon = "save"
+    name = "KerasSave"
+
+    inputs = [
+        Input(
+            name="input_model",
+            display_name="Model",
+            field_type="Data",
+            required=True,
+            info="Model to save.",
+            input_types=["Sequential"],
+        ),
+        StrInput(
+            name="directory",
+            display_name="Directory",
+            info="Directory the model is saved to. Weights are stored in its weights/ subdirectory by content hash, "
+                 "so models sharing weights store them once.",
+            required=True,
+        ),
+        StrInput(
+            name="model_name",
+            display_name="Name",
+            info="File name of the saved model, without extension.",
+            value="model",
+        ),
+        BoolInput(
+            name="save_archive",
+            display_name="Save .keras Archive",
+            info="Also save the complete model (including optimizer state) as a .keras archive.",
+            value=True,
+        ),
+        DropdownInput(
+            name="export_format",
+            display_name="Inference Export",
+            info="Inference-only export. auto picks SavedModel for tensorflow and jax and TorchScript for torch.",
+            options=["none", "auto", "saved_model", "onnx", "torchscript"],
+            value="none",
+        ),
+    ]
+
+    outputs = [
+        Output(display_name="Saved Model", name="saved", method="save_model"),
+    ]
+
+    def save_model (self) -> Data:
+        if isinstance(self.input_model, Data):
+            model = resolve_model(self.input_model.model)
+        else:
+            raise ValueError("Cannot read input model")
+
+        import keras
+
+        start = time.perf_counter()
+        directory = os.path.expanduser(self.directory.strip())
+        os.makedirs(directory, exist_ok=True)
+        base = os.path.join(directory, self.model_name)
+
+        hashes, written = store_weights(os.path.join(directory, "weights"), model.get_weights())
+
+        manifest = dict(
+            backend=keras.backend.backend(),
+            keras_version=keras.__version__,
+            config=json.loads(model.to_json()),
+            compile_config=model.get_compile_config(),
+            weights=hashes,
+        )
+        manifest_path = base + ".manifest.json"
+        with open(manifest_path + ".tmp", "w") as f:
+            json.dump(manifest, f, default=repr)
+        os.replace(manifest_path + ".tmp", manifest_path)
+
+        archive_path = None
+        if self.save_archive:
+            archive_path = base + ".keras"
+            model.save(archive_path)
+
+        export_path = self.export(model, base, keras.backend.backend())
+
+        result = dict(
+            manifest=manifest_path,
+            archive=archive_path,
+            export=export_path,
+            weights_written=written,
+            weights_reused=len(hashes) - written,
+            seconds=time.perf_counter() - start,
+        )
+        self.status = result
+
+        return Data(**result)
+
+    def export (self, model, base: str, backend: str):
+        export_format = self.export_format
+
+        if export_format == "none":
+            return None
+
+        if export_format == "auto":
+            export_format = "torchscript" if backend == "torch" else "saved_model"
+
+        if export_format == "saved_model":
+            path = base + "_savedmodel"
+            model.export(path, format="tf_saved_model")
+        elif export_format == "onnx":
+            path = base + ".onnx"
+            model.export(path, format="onnx")
+        elif export_format == "torchscript":
+            if backend != "torch":
+                raise ValueError("TorchScript export needs the torch backend.")
+
+            import torch
+
+            # variable (None) dimensions are traced with length 1
+            example = torch.zeros((1, *(dim or 1 for dim in model.input_shape[1:])), dtype=torch.float32)
+            path = base + ".pt"
+            model.eval()
+            torch.jit.trace(model, example, check_trace=False).save(path)
+        else:
+            raise ValueError(f"Unknown export format {export_format}")
+
+        return path
@@ -27,7 +27,7 @@ from langflow.custom import Component
 from langflow.template import Input, Output
 from langflow.schema import Data
 import os
-import sys
+from dl_utils import ModelSpec, start_warmup, wait_for_warmup, warmup_report
 
 from langflow.io import (
     BoolInput,
@@ -42,6 +42,9 @@ os.environ["TF_GPU_ALLOCATOR"]="cuda_malloc_async"
 os.environ["TF_CPP_VMODULE"]="gpu_process_state=10,gpu_cudamallocasync_allocator=10"
 os.environ["XLA_PYTHON_CLIENT_PREALLOCATE"]="false"
 
+# opt-in (LANGFLOW_KERAS_WARMUP): import keras in the background as soon as the component is loaded
+start_warmup()
+
 class KerasSequential (Component):
     display_name = "Keras Sequential"
     description = "Creates a sequential model."
@@ -57,27 +60,35 @@ class KerasSequential (Component):
             options=["tensorflow", "torch", "jax"],
             value="tensorflow",
         ),
+        DropdownInput(
+            name="dtype_policy",
+            display_name="Precision",
+            info="Dtype policy of the model's layers. Mixed policies compute in 16 bits and keep float32 weights; "
+                 "mixed_bfloat16 suits CPUs with bf16 support, mixed_float16 uses loss scaling.",
+            options=["float32", "mixed_bfloat16", "mixed_float16"],
+            value="float32",
+            advanced=True,
+        ),
     ]
 
     outputs = [
         Output(display_name="Output", name="output", method="create_sequential"),
     ]
     
-    # hack because keras cannot dynamically switch backends
-    def remove_keras_modules (self):
-        keras_modules = [module for module in sys.modules if module.startswith('keras') ]
-        for module in keras_modules:
-            sys.modules.pop(module, None)
-        sys.modules.pop ('tensorflow.python.trackable.data_structures', None)
-        print("Keras modules removed:", keras_modules)
-
     def create_sequential (self) -> Data:
-        
-        self.remove_keras_modules ()
-        os.environ["KERAS_BACKEND"] = self.input_backend
 
-        import keras
+        # never switch backends underneath an import that is still running
+        wait_for_warmup()
+
+        report = warmup_report()
+        if report["seconds"] is not None:
+            if report["error"] is not None:
+                self.status = f"Keras warm-up ({report['backend']}) failed after {report['seconds']:.2f}s: {report['error']}"
+            else:
+                self.status = f"Keras warm-up ({report['backend']}) took {report['seconds']:.2f}s"
 
-        model = keras.Sequential()
+        # the keras model is only built from the spec at compile time; keras cannot switch
+        # backends once imported, so it is then only reloaded on a backend change
+        model = ModelSpec(backend=self.input_backend, dtype_policy=self.dtype_policy)
 
         return Data (model=model)
@@ -0,0 +1,132 @@
+"""
+Copyright (c) 2025 Authors
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is furnished
+to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED,
+INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A
+PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+Author: James Guana
+"""
+
+from langflow.custom import Component
+from langflow.template import Input, Output
+from langflow.schema import Data
+from langflow.io import BoolInput, DataFrameInput, FloatInput, IntInput, StrInput
+from concurrent.futures import ThreadPoolExecutor
+from dl_utils import frame_to_array, input_dtype, resolve_model
+
+class KerasServe(Component):
+    display_name = "Keras Serve"
+    description = "Keeps the model resident and serves predictions, coalescing concurrent requests into batches."
+    documentation = "https://keras.io/api/models/model_training_apis/#predictonbatch-method"
+    icon = "train"
+    name = "KerasServe"
+
+    inputs = [
+        Input(
+            name="input_model",
+            display_name="Model",
+            field_type="Data",
+            required=True,
+            info="Model to be served.",
+            input_types=["Sequential"],
+        ),
+        StrInput(
+            name="service_name",
+            display_name="Service Name",
+            info="Name of the service. Running the flow again with a new model or settings replaces it.",
+            value="default",
+        ),
+        IntInput(
+            name="max_batch_size",
+            display_name="Max Batch Size",
+            info="Maximum number of rows coalesced into one prediction call.",
+            value=64,
+        ),
+        FloatInput(
+            name="max_wait_ms",
+            display_name="Max Wait (ms)",
+            info="How long a batch waits for more requests after the first one arrives.",
+            value=5.0,
+        ),
+        BoolInput(
+            name="http",
+            display_name="HTTP Endpoint",
+            info="Serve POST /predict ({\"inputs\": [...]}) and GET /stats on a local port.",
+            value=True,
+        ),
+        StrInput(
+            name="host",
+            display_name="Host",
+            value="127.0.0.1",
+            advanced=True,
+        ),
+        IntInput(
+            name="port",
+            display_name="Port",
+            info="Port of the HTTP endpoint. 0 picks a free port.",
+            value=8765,
+            advanced=True,
+        ),
+        DataFrameInput(
+            name="x",
+            display_name="Test Data (x)",
+            info="Optional rows sent as concurrent single-row requests to measure latency and batch fill.",
+            field_type="DataFrame",
+            required=False,
+        ),
+        IntInput(
+            name="test_clients",
+            display_name="Test Clients",
+            info="Number of concurrent clients sending the test rows.",
+            value=16,
+            advanced=True,
+        ),
+    ]
+
+    outputs = [
+        Output(display_name="Service", name="service", method="serve"),
+    ]
+
+    def serve (self) -> Data:
+        from dl_serving import start_service
+
+        if isinstance(self.input_model, Data):
+            model = resolve_model(self.input_model.model)
+        else:
+            raise ValueError("Cannot read input model")
+
+        if self.max_batch_size < 1:
+            raise ValueError("Max batch size must be at least 1.")
+
+        service = start_service(
+            self.service_name or "default",
+            model,
+            self.max_batch_size,
+            self.max_wait_ms,
+            input_dtype(model),
+            self.host if self.http else "",
+            self.port,
+        )
+
+        if self.x is not None:
+            x = frame_to_array(self.x, dtype=input_dtype(model), name="x")
+            # a single column converts to 1-D; requests are lists of samples
+            x = x.reshape(len(x), 1) if x.ndim == 1 else x
+            with ThreadPoolExecutor(max_workers=max(1, self.test_clients)) as pool:
+                list(pool.map(lambda i: service.batcher.predict(x[i:i + 1]), range(len(x))))
+
+        return Data(url=service.url, **service.batcher.stats())
@@ -0,0 +1,278 @@
+"""
+Copyright (c) 2025 Authors
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is furnished
+to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED,
+INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A
+PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+Author: James Guana
+"""
+
+# Imported lazily by KerasFit: it subclasses keras.utils.PyDataset, so it must be
+# loaded after the backend has been selected (and is purged together with keras).
+
+from collections import OrderedDict
+import math
+import threading
+
+import keras
+import numpy as np
+import pandas as pd
+
+from dl_utils import ChunkedSource, frame_to_array
+
+
+class StreamingDataset (keras.utils.PyDataset):
+    """Out-of-core training data read chunk by chunk from a ChunkedSource.
+
+    Each epoch the chunk order is permuted and `shuffle_chunks` consecutive chunks
+    form a shuffle block whose rows are permuted together. At most `cache_blocks`
+    blocks are held in memory at once; keras bounds the prefetched batches with
+    `max_queue_size`.
+    """
+
+    def __init__ (
+        self,
+        source: ChunkedSource,
+        x_columns,
+        y_columns,
+        batch_size: int = 32,
+        shuffle_chunks: int = 4,
+        seed: int = 0,
+        cache_blocks: int = 2,
+        dtype=np.float32,
+        **kwargs,
+    ):
+        super().__init__(**kwargs)
+        self.source = source
+        self.x_columns = list(x_columns)
+        self.y_columns = list(y_columns)
+        self.batch_size = batch_size
+        self.shuffle_chunks = max(1, shuffle_chunks)
+        self.seed = seed
+        self.dtype = dtype
+        self.cache_blocks = max(1, cache_blocks) + self.workers
+        self.epoch = 0
+        self._blocks = OrderedDict()
+        self._lock = threading.Lock()
+        self._plan_epoch()
+
+    def __len__ (self):
+        return math.ceil(self.num_rows / self.batch_size)
+
+    @property
+    def num_rows (self) -> int:
+        return self.source.num_rows
+
+    def on_epoch_end (self):
+        self.epoch += 1
+        self._plan_epoch()
+
+    def _plan_epoch (self):
+        rng = np.random.default_rng((self.seed, self.epoch))
+        order = rng.permutation(len(self.source.chunks)) if self.shuffle_chunks > 1 else np.arange(len(self.source.chunks))
+        self._block_chunks = [order[i:i + self.shuffle_chunks] for i in range(0, len(order), self.shuffle_chunks)]
+        sizes = [sum(self.source.chunks[c][-1] for c in chunks) for chunks in self._block_chunks]
+        self._block_offsets = np.cumsum([0] + sizes)
+        with self._lock:
+            self._blocks.clear()
+
+    def _load_block (self, block: int):
+        key = (self.epoch, block)
+
+        with self._lock:
+            if key in self._blocks:
+                self._blocks.move_to_end(key)
+                return self._blocks[key]
+
+        columns = self.x_columns + self.y_columns
+        frames = [self.source.read_chunk(c, columns=columns) for c in self._block_chunks[block]]
+        frame = frames[0] if len(frames) == 1 else pd.concat(frames, ignore_index=True)
+
+        if self.shuffle_chunks > 1:
+            rows = np.random.default_rng((self.seed, self.epoch, block)).permutation(len(frame))
+            frame = frame.iloc[rows]
+
+        arrays = (
+            frame_to_array(frame[self.x_columns], dtype=self.dtype, name="x"),
+            frame_to_array(frame[self.y_columns], name="y") if self.y_columns else None,
+        )
+
+        with self._lock:
+            self._blocks[key] = arrays
+            while len(self._blocks) > self.cache_blocks:
+                self._blocks.popitem(last=False)
+
+        return arrays
+
+    def __getitem__ (self, index):
+        start = index * self.batch_size
+        stop = min(start + self.batch_size, self.source.num_rows)
+
+        first = int(np.searchsorted(self._block_offsets, start, side="right")) - 1
+        last = int(np.searchsorted(self._block_offsets, stop - 1, side="right")) - 1
+
+        xs, ys = [], []
+        for block in range(first, last + 1):
+            x, y = self._load_block(block)
+            lo = max(start, self._block_offsets[block]) - self._block_offsets[block]
+            hi = min(stop, self._block_offsets[block + 1]) - self._block_offsets[block]
+            xs.append(x[lo:hi])
+            if y is not None:
+                ys.append(y[lo:hi])
+
+        x = xs[0] if len(xs) == 1 else np.concatenate(xs)
+        if not ys:
+            return x
+        return x, ys[0] if len(ys) == 1 else np.concatenate(ys)
+
+
+
+class ArrayDataset (keras.utils.PyDataset):
+    """Batches gathered on demand from (memory-mapped) arrays.
+
+    Only the rows of the batch being consumed are read, so a memory-mapped file
+    is paged in batch by batch instead of being copied up front. `indices`
+    restricts the dataset to a subset of rows, e.g. a train/validation split.
+    """
+
+    def __init__ (self, x, y=None, indices=None, batch_size: int = 32, shuffle: bool = False, seed: int = 0, dtype=np.float32, **kwargs):
+        super().__init__(**kwargs)
+        self.x = x
+        self.y = y
+        self.indices = indices
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+        self.seed = seed
+        self.dtype = dtype
+        self.epoch = 0
+        self._order = None
+        self._plan_epoch()
+
+    def __len__ (self):
+        return math.ceil(self.num_rows / self.batch_size)
+
+    @property
+    def num_rows (self) -> int:
+        return len(self.indices) if self.indices is not None else len(self.x)
+
+    def on_epoch_end (self):
+        self.epoch += 1
+        self._plan_epoch()
+
+    def _plan_epoch (self):
+        if self.shuffle:
+            self._order = np.random.default_rng((self.seed, self.epoch)).permutation(self.num_rows)
+
+    def __getitem__ (self, index):
+        start = index * self.batch_size
+        stop = min(start + self.batch_size, self.num_rows)
+
+        if self._order is None and self.indices is None:
+            rows = slice(start, stop)
+        else:
+            rows = self._order[start:stop] if self._order is not None else np.arange(start, stop)
+            if self.indices is not None:
+                rows = self.indices[rows]
+            if self._order is not None:
+                # row order within a shuffled batch is irrelevant; sorted reads keep page access sequential
+                rows = np.sort(rows)
+
+        x = np.asarray(self.x[rows], dtype=self.dtype)
+        if self.y is None:
+            return x
+        return x, np.asarray(self.y[rows], dtype=np.float32)
+
+
+class BucketedSequenceDataset (keras.utils.PyDataset):
+    """Batches of variable-length sequences grouped by length.
+
+    Sequences are split into `num_buckets` length buckets (by quantile) and every batch
+    is drawn from a single bucket and padded with `mask_value` only up to the bucket's
+    upper bound; the few distinct batch lengths keep jit backends from retracing for every
+    batch. The model must mask the padded steps (Keras Fit and Keras Predict check for a
+    Masking layer), otherwise a row's result depends on the rows sharing its batch.
+    Training batches are padded to full size with zero-weight rows, so metrics should be
+    compiled as weighted_metrics (Keras Compile does). Without shuffling the rows are
+    sorted by length; `order` holds the row behind each output position.
+    """
+
+    def __init__ (self, sequences, y=None, batch_size: int = 32, num_buckets: int = 4, shuffle: bool = False, seed: int = 0,
+                  mask_value: float = 0.0, dtype=np.float32, **kwargs):
+        super().__init__(**kwargs)
+        self.sequences = sequences
+        self.y = y
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+        self.seed = seed
+        self.mask_value = mask_value
+        self.dtype = dtype
+        self.epoch = 0
+        self.lengths = np.fromiter((len(sequence) for sequence in sequences), dtype=np.int64, count=len(sequences))
+        self.features = next((sequence.shape[1] for sequence in sequences if len(sequence)), 1)
+
+        quantiles = np.quantile(self.lengths, np.linspace(0, 1, max(1, num_buckets) + 1)[1:], method="higher")
+        self.boundaries = np.unique(np.maximum(quantiles, 1))
+        self.buckets = np.searchsorted(self.boundaries, self.lengths)
+        self._plan_epoch()
+
+    def __len__ (self):
+        return len(self._batches)
+
+    @property
+    def num_rows (self) -> int:
+        return len(self.sequences)
+
+    @property
+    def order (self) -> np.ndarray:
+        return np.concatenate(self._batches)
+
+    def on_epoch_end (self):
+        self.epoch += 1
+        self._plan_epoch()
+
+    def _plan_epoch (self):
+        if not self.shuffle:
+            order = np.argsort(self.lengths, kind="stable")
+            self._batches = [order[start:start + self.batch_size] for start in range(0, len(order), self.batch_size)]
+            return
+
+        rng = np.random.default_rng((self.seed, self.epoch))
+        batches = []
+        for bucket in np.unique(self.buckets):
+            rows = rng.permutation(np.flatnonzero(self.buckets == bucket))
+            batches.extend(rows[start:start + self.batch_size] for start in range(0, len(rows), self.batch_size))
+        self._batches = [batches[i] for i in rng.permutation(len(batches))]
+
+    def __getitem__ (self, index):
+        rows = self._batches[index]
+        steps = self.boundaries[np.searchsorted(self.boundaries, self.lengths[rows].max())]
+        # training batches are always full, so there is one traced shape per bucket
+        size = len(rows) if self.y is None else self.batch_size
+        x = np.full((size, steps, self.features), self.mask_value, dtype=self.dtype)
+        for i, row in enumerate(rows):
+            sequence = self.sequences[row]
+            x[i, :len(sequence)] = sequence
+
+        if self.y is None:
+            return x
+
+        # padding rows get no weight; the others are scaled so the batch mean stays the same
+        y = np.zeros((size, *np.shape(self.y)[1:]), dtype=np.float32)
+        y[:len(rows)] = self.y[rows]
+        weights = np.zeros(size, dtype=np.float32)
+        weights[:len(rows)] = size / len(rows)
+        return x, y, weights
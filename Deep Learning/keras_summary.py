@@ -23,10 +23,12 @@ Author: James Guana
 
 from langflow.custom import Component
 from langflow.template import Input, Output
-from langflow.schema import Data
+from langflow.schema import Data, DataFrame
+from langflow.io import DropdownInput, IntInput
 import io
 import contextlib
-import gc
+from dl_cost import cost_table
+from dl_utils import REGISTRY, available_memory, flow_owner, resolve_model
 
 class KerasSummary(Component):
     display_name = "Keras Summary"
@@ -43,10 +45,34 @@ class KerasSummary(Component):
             info="Input model.",
             input_types=["Sequential"]
         ),
+        IntInput(
+            name="batch_size",
+            display_name="Batch Size",
+            info="Batch size the activation and training memory estimates are made for.",
+            value=32,
+        ),
+        IntInput(
+            name="memory_budget_mb",
+            display_name="Memory Budget (MB)",
+            info="Fail the cost analysis when the estimated training memory exceeds this. 0 disables the check.",
+            value=0,
+            advanced=True,
+        ),
+        DropdownInput(
+            name="release",
+            display_name="Release Models",
+            info="Models to release from the registry and caches after the summary: "
+            "none, only idle ones, the other models of this flow, or all.",
+            options=["none", "idle", "flow", "all"],
+            value="idle",
+            advanced=True,
+        ),
     ]
 
     outputs = [
         Output(display_name="Model Summary", name="summary", method="print_summary"),
+        Output(display_name="Cost Analysis", name="cost_analysis", method="cost_analysis"),
+        Output(display_name="Memory Report", name="memory_report", method="memory_report"),
     ]
 
     def print_summary(self) -> str:
@@ -54,7 +80,7 @@ class KerasSummary(Component):
         model = None
 
         if isinstance(self.input_model, Data):
-            model = self.input_model.model
+            model = resolve_model(self.input_model.model)
 
             with io.StringIO() as buf, contextlib.redirect_stdout(buf):
                 model.summary()
@@ -64,10 +90,49 @@ class KerasSummary(Component):
 
         return model_summary
 
-    def reset_keras(self, model):
-        del model
-        gc.collect ()
-        # a = tf.zeros([], tf.float32)
-        # del a
-        # gc.collect ()
-        # tf.keras.backend.clear_session()
+    def cost_analysis(self) -> DataFrame:
+        if not isinstance(self.input_model, Data):
+            raise ValueError("Cannot read input model")
+
+        model = resolve_model(self.input_model.model)
+        rows = cost_table(model, self.batch_size or 32)
+        total = rows[-1]
+
+        self.status = f"{total['flops_per_sample'] / 1e6:.2f} MFLOPs per sample, " \
+            f"~{total['training_memory_bytes'] / 1024 ** 2:.1f} MB to train at batch size {self.batch_size or 32}"
+
+        if self.memory_budget_mb and total["training_memory_bytes"] > self.memory_budget_mb * 1024 ** 2:
+            raise ValueError(
+                f"Estimated training memory of {total['training_memory_bytes'] / 1024 ** 2:.1f} MB "
+                f"exceeds the budget of {self.memory_budget_mb} MB."
+            )
+
+        return DataFrame(rows)
+
+    def memory_report(self) -> DataFrame:
+        released = self.reset_keras(self.input_model.model if isinstance(self.input_model, Data) else None)
+
+        rows = REGISTRY.report()
+        self.status = f"{len(rows)} models, {sum(row['weight_bytes'] for row in rows) / 1024 ** 2:.1f} MB of weights, " \
+            f"{available_memory() / 1024 ** 2:.0f} MB free, {released} released"
+
+        return DataFrame(rows, columns=["name", "owner", "source", "backend", "weight_bytes", "idle_seconds", "age_seconds", "cached"])
+
+    def reset_keras(self, model) -> int:
+        """Releases registered models according to the release option, keeping `model`.
+
+        Returns the number of models released.
+        """
+
+        if self.release == "idle":
+            released = REGISTRY.evict()
+        elif self.release in ("flow", "all"):
+            owner = flow_owner(self) if self.release == "flow" else None
+            released = REGISTRY.release(owner=owner, keep=model)
+        else:
+            released = 0
+
+        if released:
+            self.status = f"Released {released} models"
+
+        return released
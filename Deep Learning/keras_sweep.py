@@ -0,0 +1,230 @@
+"""
+Copyright (c) 2025 Authors
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is furnished
+to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED,
+INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A
+PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+Author: James Guana
+"""
+
+from langflow.custom import Component
+from langflow.template import Input, Output
+from langflow.schema import Data, DataFrame
+from langflow.io import DataFrameInput, DropdownInput, FloatInput, IntInput, MultilineInput
+import json
+from dl_utils import REGISTRY, ModelSpec, check_samples, flow_owner, frame_to_array
+
+class KerasSweep (Component):
+    display_name = "Keras Sweep"
+    description = "Searches units, optimizer, batch size and epochs with parallel trials and successive halving."
+    documentation = "https://keras.io/api/models/model_training_apis/#fit-method"
+    icon = "train"
+    name = "KerasSweep"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.sweep_result = None
+
+    inputs = [
+        Input(
+            name="input_model",
+            display_name="Model",
+            field_type="Data",
+            required=True,
+            info="Model specification from the layer components (before Keras Compile).",
+            input_types=["Sequential"],
+        ),
+        DataFrameInput(
+            name="x",
+            display_name="Input Data (x)",
+            info="Input data for training.",
+            field_type="DataFrame",
+            required=True,
+        ),
+        DataFrameInput(
+            name="y",
+            display_name="Target Data (y)",
+            info="Target data for training.",
+            field_type="DataFrame",
+        ),
+        MultilineInput(
+            name="search_space",
+            display_name="Search Space",
+            info="JSON object of value lists for input_units, optimizer, batch_size and input_epochs, e.g. "
+                 '{"input_units": [16, 64], "optimizer": ["adam", "sgd"], "batch_size": [32, 128], "input_epochs": [9]}. '
+                 "input_units applies to every layer with units except the output layer.",
+            value='{"input_units": [16, 64], "optimizer": ["adam", "rmsprop"], "batch_size": [32]}',
+        ),
+        DropdownInput(
+            name="optimizer",
+            display_name="Optimizer",
+            info="Optimizer of trials whose search space does not set one.",
+            options=["adam", "sgd", "rmsprop", "adagrad", "adadelta"],
+            value="rmsprop",
+        ),
+        DropdownInput(
+            name="input_loss",
+            display_name="Loss",
+            info="Select the loss function for model compilation.",
+            options=[
+                "sparse_categorical_crossentropy",
+                "categorical_crossentropy",
+                "binary_crossentropy",
+                "mean_squared_error",
+                "mean_absolute_error",
+            ],
+            value="mean_squared_error",
+        ),
+        DropdownInput(
+            name="input_metrics",
+            display_name="Metrics",
+            info="Select the metrics for model evaluation.",
+            options=["None", "accuracy", "precision", "recall", "f1_score", "auc"],
+            value="None",
+        ),
+        IntInput(
+            name="input_epochs",
+            display_name="Epochs",
+            info="Epochs of trials whose search space does not set input_epochs.",
+            value=9,
+        ),
+        IntInput(
+            name="batch_size",
+            display_name="Batch Size",
+            info="Batch size of trials whose search space does not set batch_size.",
+            value=32,
+        ),
+        FloatInput(
+            name="validation_split",
+            display_name="Validation Split",
+            info="Fraction of the data trials are scored on (validation loss).",
+            value=0.2,
+        ),
+        IntInput(
+            name="min_epochs",
+            display_name="Minimum Epochs",
+            info="Epochs every trial trains before the first pruning.",
+            value=1,
+            advanced=True,
+        ),
+        IntInput(
+            name="reduction_factor",
+            display_name="Reduction Factor",
+            info="Each pruning round keeps the best 1/N trials and trains them N times longer.",
+            value=3,
+            advanced=True,
+        ),
+        IntInput(
+            name="max_trials",
+            display_name="Max Trials",
+            info="Random subset of the grid to try. 0 tries every combination.",
+            value=0,
+            advanced=True,
+        ),
+        IntInput(
+            name="workers",
+            display_name="Workers",
+            info="Concurrent trial processes. 0 uses one per CPU core, limited by the memory budget.",
+            value=0,
+            advanced=True,
+        ),
+        IntInput(
+            name="memory_budget_mb",
+            display_name="Memory Budget (MB)",
+            info="Memory the concurrent trial processes may use together.",
+            value=4096,
+            advanced=True,
+        ),
+        IntInput(
+            name="seed",
+            display_name="Seed",
+            info="Seed of the random trial subset.",
+            value=0,
+            advanced=True,
+        ),
+    ]
+
+    outputs = [
+        Output(display_name="Results", name="results", method="get_results"),
+        Output(display_name="Best Model", name="best_model", method="get_best_model"),
+    ]
+
+    def get_results (self) -> DataFrame:
+        rows, _ = self.run_sweep()
+        return DataFrame(rows)
+
+    def get_best_model (self) -> Data:
+        _, model = self.run_sweep()
+        return Data(model=REGISTRY.track(model, flow_owner(self), self.name))
+
+    def run_sweep (self):
+        if self.sweep_result is not None:
+            return self.sweep_result
+
+        if isinstance(self.input_model, Data) and isinstance(self.input_model.model, ModelSpec):
+            spec = self.input_model.model
+        else:
+            raise ValueError("Input model should be a model specification from the layer components.")
+
+        try:
+            search_space = json.loads(self.search_space or "{}")
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Search space is not valid JSON: {e}") from e
+
+        if not isinstance(search_space, dict):
+            raise ValueError("Search space should be a JSON object of value lists.")
+
+        x = frame_to_array(self.x, name="x")
+        y = frame_to_array(self.y, name="y")
+        check_samples(x, y)
+
+        compile_settings = dict(
+            optimizer=self.optimizer,
+            loss=self.input_loss,
+            metrics=self.input_metrics if self.input_metrics != "None" else None,
+        )
+        defaults = dict(
+            optimizer=self.optimizer,
+            batch_size=self.batch_size or 32,
+            input_epochs=self.input_epochs or 1,
+        )
+
+        from dl_parallel import build_trial_model, run_sweep
+
+        rows, best, workers = run_sweep(
+            spec,
+            x,
+            y,
+            search_space,
+            compile_settings,
+            defaults,
+            validation_split=self.validation_split,
+            reduction_factor=self.reduction_factor,
+            min_epochs=self.min_epochs,
+            max_trials=self.max_trials,
+            workers=self.workers,
+            memory_budget=self.memory_budget_mb * 1024 ** 2,
+            seed=self.seed,
+        )
+
+        model = build_trial_model(spec, best["params"], compile_settings)
+        model.set_weights(best["weights"])
+
+        self.status = f"{len(rows)} trials on {workers} workers, best: {best['params']} (score {best['score']:.4g})"
+        self.sweep_result = (rows, model)
+
+        return self.sweep_result
@@ -0,0 +1,254 @@
+"""
+Copyright (c) 2025 Authors
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is furnished
+to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED,
+INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A
+PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+Author: James Guana
+"""
+
+# Benchmarks the Deep Learning components on each keras backend with synthetic data: a
+# Dense model (Sequential, Input, Dense, Compile, Fit, Predict) and a sequence model
+# (Conv1D, GRU, Summary with cost analysis, Fit). Serving, quantization, sweeps, saving
+# and the NumPy dataset are not covered.
+# Every backend runs in its own interpreter, since keras cannot switch backends once
+# imported and the import itself is one of the measurements.
+#
+#   python benchmarks/bench_components.py --backends tensorflow,torch,jax --save-baseline
+#   python benchmarks/bench_components.py --backends tensorflow,torch,jax --threshold 0.2
+#
+# The second run compares against benchmarks/baseline.json and exits with status 1 if a
+# metric regressed by more than the threshold.
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+COMPONENTS = os.path.join(os.path.dirname(HERE), "Deep Learning")
+
+# metric -> True if higher is better
+METRICS = {
+    "import_seconds": False,
+    "build_seconds": False,
+    "conversion_seconds": False,
+    "fit_steps_per_second": True,
+    "predict_latency_ms": False,
+    "predict_samples_per_second": True,
+    "sequence_build_seconds": False,
+    "summary_seconds": False,
+    "sequence_fit_steps_per_second": True,
+}
+
+
+def median (values):
+    values = sorted(values)
+    return values[len(values) // 2]
+
+
+def last_epoch_steps_per_second (performance) -> float:
+    # the first epoch includes tracing
+    last = performance.iloc[-1]
+    return float(last["steps"] / last["epoch_seconds"])
+
+
+def run_worker (args) -> dict:
+    start = time.perf_counter()
+    import keras
+    import_seconds = time.perf_counter() - start
+
+    sys.path.insert(0, COMPONENTS)
+    import numpy as np
+    import pandas as pd
+    from dl_utils import frame_to_array
+    from keras_compile import KerasCompile
+    from keras_fit import KerasFit
+    from keras_layer_conv import KerasConv
+    from keras_layer_dense import KerasDense
+    from keras_layer_input import KerasInput
+    from keras_layer_recurrence import KerasRecurrent
+    from keras_predict import KerasPredict
+    from keras_sequential import KerasSequential
+    from keras_summary import KerasSummary
+
+    rng = np.random.default_rng(0)
+    x = pd.DataFrame(rng.random((args.rows, args.features), dtype=np.float32), columns=[f"f{i}" for i in range(args.features)])
+    y = pd.DataFrame({"y": rng.random(args.rows, dtype=np.float32)})
+
+    timings = []
+    for _ in range(args.repeats):
+        start = time.perf_counter()
+        model = KerasSequential(input_backend=keras.backend.backend()).create_sequential()
+        model = KerasInput(input_model=model, input_shape=str(args.features)).add_input_layer()
+        model = KerasDense(input_model=model, input_units=args.units, input_activation="relu").add_layer()
+        model = KerasDense(input_model=model, input_units=1).add_layer()
+        compiled = KerasCompile(input_model=model, optimizer="adam", input_loss="mean_squared_error", use_model_cache=False).compile_model()
+        timings.append(time.perf_counter() - start)
+    build_seconds = median(timings)
+
+    timings = []
+    for _ in range(args.repeats):
+        start = time.perf_counter()
+        frame_to_array(x)
+        timings.append(time.perf_counter() - start)
+    conversion_seconds = median(timings)
+
+    fit = KerasFit(input_model=compiled, x=x, y=y, input_epochs=max(2, args.epochs), batch_size=args.batch_size, cache_arrays=False)
+    fit_steps_per_second = last_epoch_steps_per_second(fit.get_performance())
+    fitted = fit.fit_model()
+
+    batch = x.iloc[:args.batch_size]
+    timings = []
+    for _ in range(args.repeats + 1):
+        start = time.perf_counter()
+        KerasPredict(input_model=fitted, x=batch, batch_size=args.batch_size, cache_arrays=False).predict()
+        timings.append(time.perf_counter() - start)
+    predict_latency_ms = median(timings[1:]) * 1000.0
+
+    start = time.perf_counter()
+    KerasPredict(input_model=fitted, x=x, batch_size=args.batch_size, cache_arrays=False).predict()
+    predict_samples_per_second = args.rows / (time.perf_counter() - start)
+
+    # sequence model: Conv1D downsampling in front of a GRU
+    sequences = pd.DataFrame({"x": list(rng.random((args.sequence_rows, args.sequence_length, args.features), dtype=np.float32))})
+    sequence_y = pd.DataFrame({"y": rng.random(args.sequence_rows, dtype=np.float32)})
+
+    timings = []
+    for _ in range(args.repeats):
+        start = time.perf_counter()
+        model = KerasSequential(input_backend=keras.backend.backend()).create_sequential()
+        model = KerasInput(input_model=model, input_shape=f"{args.sequence_length}, {args.features}").add_input_layer()
+        model = KerasConv(
+            input_model=model, input_conv_type="Conv1D", filters=args.units, kernel_size="3", strides="2", padding="same", input_activation="relu"
+        ).add_layer()
+        model = KerasRecurrent(input_model=model, input_recurrent_type="GRU", units=args.units).add_layer()
+        model = KerasDense(input_model=model, input_units=1).add_layer()
+        sequence_model = KerasCompile(input_model=model, optimizer="adam", input_loss="mean_squared_error", use_model_cache=False).compile_model()
+        timings.append(time.perf_counter() - start)
+    sequence_build_seconds = median(timings)
+
+    timings = []
+    for _ in range(args.repeats):
+        start = time.perf_counter()
+        summary = KerasSummary(input_model=sequence_model, batch_size=args.batch_size, release="none")
+        summary.print_summary()
+        summary.cost_analysis()
+        timings.append(time.perf_counter() - start)
+    summary_seconds = median(timings)
+
+    fit = KerasFit(
+        input_model=sequence_model, x=sequences, y=sequence_y, input_epochs=max(2, args.epochs), batch_size=args.batch_size, cache_arrays=False
+    )
+    sequence_fit_steps_per_second = last_epoch_steps_per_second(fit.get_performance())
+
+    return dict(
+        import_seconds=import_seconds,
+        build_seconds=build_seconds,
+        conversion_seconds=conversion_seconds,
+        fit_steps_per_second=fit_steps_per_second,
+        predict_latency_ms=predict_latency_ms,
+        predict_samples_per_second=predict_samples_per_second,
+        sequence_build_seconds=sequence_build_seconds,
+        summary_seconds=summary_seconds,
+        sequence_fit_steps_per_second=sequence_fit_steps_per_second,
+        keras_version=keras.__version__,
+    )
+
+
+def run_backend (backend: str, argv: list) -> dict:
+    env = dict(os.environ, KERAS_BACKEND=backend, PYTHONPATH=os.pathsep.join([COMPONENTS, os.environ.get("PYTHONPATH", "")]))
+    process = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--worker", *argv],
+        env=env, capture_output=True, text=True,
+    )
+    if process.returncode != 0:
+        return dict(error=process.stderr.strip().splitlines()[-1] if process.stderr.strip() else f"exit status {process.returncode}")
+    # components print progress; the result is the last line
+    return json.loads(process.stdout.strip().splitlines()[-1])
+
+
+def compare (results: dict, baseline: dict, threshold: float) -> list:
+    regressions = []
+    for backend, metrics in results.items():
+        for metric, higher_is_better in METRICS.items():
+            current, reference = metrics.get(metric), baseline.get(backend, {}).get(metric)
+            if current is None or not reference:
+                continue
+            change = (current - reference) / reference
+            if (change < -threshold) if higher_is_better else (change > threshold):
+                regressions.append(f"{backend} {metric}: {reference:.4g} -> {current:.4g} ({change:+.0%})")
+    return regressions
+
+
+def main ():
+    parser = argparse.ArgumentParser(description="Benchmark the Deep Learning components per keras backend.")
+    parser.add_argument("--backends", default="tensorflow,torch,jax")
+    parser.add_argument("--rows", type=int, default=50000)
+    parser.add_argument("--features", type=int, default=32)
+    parser.add_argument("--units", type=int, default=64)
+    parser.add_argument("--epochs", type=int, default=3, help="Fit epochs (at least 2; steps/sec is taken from the last one).")
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--sequence-rows", type=int, default=5000)
+    parser.add_argument("--sequence-length", type=int, default=32)
+    parser.add_argument("--baseline", default=os.path.join(HERE, "baseline.json"))
+    parser.add_argument("--save-baseline", action="store_true", help="Write the results as the new baseline.")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Relative change counted as a regression.")
+    parser.add_argument("--output", default="", help="Optional file the results are written to as JSON.")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args, _ = parser.parse_known_args()
+
+    if args.worker:
+        print(json.dumps(run_worker(args)))
+        return 0
+
+    argv = [arg for arg in sys.argv[1:] if arg != "--save-baseline"]
+    results = {}
+    for backend in args.backends.split(","):
+        results[backend] = run_backend(backend, argv)
+        print(backend, json.dumps(results[backend], indent=2))
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    failed = [backend for backend, metrics in results.items() if "error" in metrics]
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump({backend: metrics for backend, metrics in results.items() if "error" not in metrics}, f, indent=2)
+        print("Baseline written to", args.baseline)
+        return 1 if failed else 0
+
+    if not os.path.exists(args.baseline):
+        print("No baseline at", args.baseline, "- run with --save-baseline first.")
+        return 1 if failed else 0
+
+    with open(args.baseline) as f:
+        regressions = compare(results, json.load(f), args.threshold)
+
+    for regression in regressions:
+        print("REGRESSION", regression)
+
+    return 1 if regressions or failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
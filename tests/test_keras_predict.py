@@ -0,0 +1,34 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("langflow")
+pytest.importorskip("keras")
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Deep Learning"))
+
+from langflow.schema import Data  # noqa: E402
+
+from dl_utils import LayerSpec, ModelSpec, active_backend  # noqa: E402
+from keras_predict import KerasPredict  # noqa: E402
+
+
+def build_model (units: int):
+    import keras
+
+    spec = ModelSpec(backend=active_backend() or keras.backend.backend())
+    spec = spec.add(LayerSpec.of("Input", shape=(4,))).add(LayerSpec.of("Dense", units=units))
+    return Data(model=spec.materialize())
+
+
+@pytest.mark.parametrize("units", [1, 3])
+def test_predict_returns_one_row_per_sample (units):
+    x = pd.DataFrame(np.random.default_rng(0).random((50, 4), dtype=np.float32), columns=list("abcd"))
+
+    predictions = KerasPredict(input_model=build_model(units), x=x, batch_size=16, cache_arrays=False).predict()
+
+    assert len(predictions) == len(x)
+    assert predictions.shape[1] == units